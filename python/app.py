@@ -1,14 +1,17 @@
-from flask import Flask, render_template, jsonify, request, send_file
-import boto3
+from flask import Flask, Response, render_template, jsonify, request, send_file
 import re
 import os
 import json
 import subprocess
 import configparser
 import zipfile
+import time
+import queue
+from functools import partial
 import pandas as pd
 from datetime import datetime, timezone
 from tempfile import NamedTemporaryFile
+from threading import BoundedSemaphore, Event, Thread
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.styles import PatternFill, Alignment
@@ -41,6 +44,14 @@ from modules.sqs import list_sqs_queues
 from modules.ses import list_ses_identities
 from modules.sns import list_sns_topics
 from modules.lamda import list_lambda_functions
+from modules.context import CollectionContext
+from modules.client_pool import get_session
+from modules.rate_limiter import RATE_LIMITER
+from modules.paginate import PAGE_STATS
+from modules.scheduler import FairScheduler, DependencyScheduler
+from modules.snapshot import SnapshotStore
+from modules.singleflight import SingleFlight
+from modules.jobs import JobManager, JobQueueFull
 from openpyxl.worksheet.table import Table, TableStyleInfo
 
 app = Flask(__name__)
@@ -79,6 +90,96 @@ DETAIL_RESOURCE_MAP = {
     "route53-details": fetch_route53_data
 }
 
+# Summary variants served by /api/<resource>?summary=1: only the summary columns, without the
+# optional per-item calls. Snapshots are kept under their own key so the full collector is unaffected
+SUMMARY_RESOURCE_MAP = {
+    "s3-summary": partial(list_s3_buckets, summary_only=True)
+}
+
+# Global collectors return the same data in every region (global endpoints / account-wide listings):
+# they run once per account in multi-region runs and their snapshots are shared by every region
+RESOURCE_SCOPES = {
+    "vpcs": "regional",
+    "subnets": "regional",
+    "eks": "regional",
+    "asg": "regional",
+    "ec2": "regional",
+    "ebs": "regional",
+    "security-groups": "regional",
+    "nacl": "regional",
+    "elbs": "regional",
+    "target-groups": "regional",
+    "database": "regional",
+    "dynamodb": "regional",
+    "elasticache": "regional",
+    "msk": "regional",
+    "opensearch": "regional",
+    "route53": "global",
+    "cloudfront": "global",
+    "s3": "global",
+    "lamda": "regional",
+    "iam-role": "global",
+    "acm": "regional",
+    "kms": "regional",
+    "secrets-manager": "regional",
+    "sqs": "regional",
+    "ses": "regional",
+    "sns": "regional",
+    "security-groups-details": "regional",
+    "route53-details": "global",
+    "s3-summary": "global"
+}
+
+# Region label of global collectors' snapshots, and the region their clients are created in
+GLOBAL_REGION = "global"
+GLOBAL_SERVICE_REGION = "us-east-1"
+
+# Primary AWS service of each collector and the CollectionContext datasets it reads
+COLLECTOR_DEPENDENCIES = {
+    "vpcs": ("ec2", ["account_id", "subnets"]),
+    "subnets": ("ec2", ["subnets", "route_tables", "network_acls"]),
+    "eks": ("eks", ["subnets"]),
+    "asg": ("autoscaling", ["subnets", "instances", "target_groups"]),
+    "ec2": ("ec2", ["subnets", "instances", "volumes", "account_id"]),
+    "ebs": ("ec2", ["volumes"]),
+    "security-groups": ("ec2", ["security_groups", "network_interfaces"]),
+    "nacl": ("ec2", ["network_acls"]),
+    "elbs": ("elbv2", ["subnets", "target_groups", "resource_tags"]),
+    "target-groups": ("elbv2", ["instances", "target_groups", "resource_tags"]),
+    "database": ("rds", ["subnets"]),
+    "dynamodb": ("dynamodb", []),
+    "elasticache": ("elasticache", ["subnets", "resource_tags"]),
+    "msk": ("kafka", ["subnets"]),
+    "opensearch": ("opensearch", ["subnets"]),
+    "route53": ("route53", []),
+    "cloudfront": ("cloudfront", []),
+    "s3": ("s3", []),
+    "lamda": ("lambda", []),
+    "iam-role": ("iam", []),
+    "acm": ("acm", []),
+    "kms": ("kms", []),
+    "secrets-manager": ("secretsmanager", []),
+    "sqs": ("sqs", []),
+    "ses": ("ses", []),
+    "sns": ("sns", []),
+    "security-groups-details": ("ec2", ["security_groups", "network_interfaces", "instances"]),
+    "route53-details": ("route53", [])
+}
+
+# Shared datasets prefetched as their own graph nodes, and the service each one calls
+DATASET_SERVICES = {
+    "account_id": "sts",
+    "subnets": "ec2",
+    "instances": "ec2",
+    "network_interfaces": "ec2",
+    "security_groups": "ec2",
+    "volumes": "ec2",
+    "route_tables": "ec2",
+    "network_acls": "ec2",
+    "target_groups": "elbv2",
+    "resource_tags": "resourcegroupstaggingapi"
+}
+
 REGION_LIST = [
     "us-east-1",    # N. Virginia
     "us-east-2",    # Ohio
@@ -99,6 +200,32 @@ REGION_LIST = [
     "sa-east-1"     # São Paulo
 ]
 
+# Collectors running at once within one region / across all regions of an "All Region" download
+REGION_MAX_WORKERS = 12
+GLOBAL_MAX_WORKERS = 40
+# Collectors running at once per service within one region (others: DEFAULT_SERVICE_MAX_WORKERS)
+SERVICE_MAX_WORKERS = {"ec2": 4, "route53": 2}
+DEFAULT_SERVICE_MAX_WORKERS = 3
+# Collectors running at once for one account of an "All Accounts" download
+ACCOUNT_MAX_WORKERS = 4
+
+# Collected inventory is kept on disk and served while younger than the TTL (seconds)
+SNAPSHOT_STORE = SnapshotStore(
+    os.environ.get("INVENTORY_SNAPSHOT_DB", "~/.aws_inventory/snapshots.sqlite3"),
+    ttl=int(os.environ.get("INVENTORY_SNAPSHOT_TTL", "900"))
+)
+
+# Identical collections in flight at the same time (dashboard tabs, streams, downloads, background
+# refreshes) are keyed by (profile, region, resource) and share one run
+COLLECTIONS = SingleFlight()
+
+# Last schedule report per (profile, region) and per-task durations of live runs, used as priorities next time
+SCHEDULE_REPORTS = {}
+TASK_ESTIMATES = {}
+
+# Asynchronous download jobs: few concurrent sweeps, bounded backlog, artifacts kept for an hour
+JOB_MANAGER = JobManager(max_workers=2, max_pending=8, artifact_ttl=3600)
+
 def get_aws_profiles(config_path="~/.aws/config"):
     profiles = []
     path = os.path.expanduser(config_path)
@@ -235,18 +362,285 @@ def save_excel_with_format(sheet_dict, filename):
 
     wb.save(filename)
 
-def parallel_execute(resource_map, session):
-    results = {}
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(func, session): key for key, func in resource_map.items()}
+def resource_region(key, region):
+    # Snapshot / single-flight region label of a collector
+    return GLOBAL_REGION if RESOURCE_SCOPES.get(key) == "global" else region
+
+def session_region(region):
+    return GLOBAL_SERVICE_REGION if region == GLOBAL_REGION else region
+
+def scoped(resource_map, scope=None):
+    # scope: None (every collector), "global" or "regional"
+    return {key: func for key, func in resource_map.items() if scope is None or RESOURCE_SCOPES.get(key) == scope}
+
+def collect_snapshot(profile, region, key, func, session, context):
+    def collect():
+        return SNAPSHOT_STORE.save(profile, region, key, func(session, context))
+
+    snapshot, shared = COLLECTIONS.do((profile, region, key), collect)
+    if shared:
+        print(f"[INFO] {key} ({profile}/{region}) reused an in-flight collection")
+    return snapshot
+
+def run_collector(key, func, session, context, refresh=False, progress=None):
+    # Serve a fresh snapshot when there is one, otherwise collect live and store the result
+    labels = (context.profile_name, resource_region(key, context.region_name), key)
+    if progress:
+        progress.collector_started(*labels)
+    started = time.monotonic()
+    try:
+        snapshot = None if refresh else SNAPSHOT_STORE.fresh(*labels)
+        cached = snapshot is not None
+        if not cached:
+            snapshot = collect_snapshot(*labels, func, session, context)
+        data = snapshot.data
+    except Exception as e:
+        if progress:
+            progress.collector_finished(*labels, time.monotonic() - started, error=str(e))
+        raise
+
+    if progress:
+        rows = len(data) if isinstance(data, list) else None
+        progress.collector_finished(*labels, time.monotonic() - started, rows=rows, cached=cached)
+    return data
+
+def schedule_collectors(resource_map, session, context=None, max_workers=REGION_MAX_WORKERS, semaphore=None, refresh=False, progress=None, on_result=None, cancel=None, region=None):
+    # Collectors and the shared context datasets they read run as one dependency graph.
+    # region is the logical region (GLOBAL_REGION for the global run, whose session is in us-east-1)
+    context = context or CollectionContext(session)
+    labels = (context.profile_name, region or context.region_name)
+    estimates = TASK_ESTIMATES.setdefault(labels, {})
+    scheduler = DependencyScheduler(max_workers, SERVICE_MAX_WORKERS, DEFAULT_SERVICE_MAX_WORKERS,
+                                    estimates=dict(estimates), semaphore=semaphore, cancel=cancel)
+
+    live = set()
+    for key, func in resource_map.items():
+        service, datasets = COLLECTOR_DEPENDENCIES.get(key, (key, []))
+        # Collectors served from a fresh snapshot make no API calls, so nothing is prefetched for them
+        if refresh or not SNAPSHOT_STORE.has_fresh(labels[0], resource_region(key, labels[1]), key):
+            live.add(key)
+            live.update(f"context.{name}" for name in datasets)
+        scheduler.add(key, partial(run_collector, key, func, session, context, refresh, progress),
+                      service, [f"context.{name}" for name in datasets])
+    for name in DATASET_SERVICES:
+        if f"context.{name}" in live:
+            scheduler.add(f"context.{name}", partial(getattr, context, name), DATASET_SERVICES[name])
+
+    def on_done(name, result, error):
+        if error is not None:
+            # A failed dataset is retried lazily by the collectors that need it
+            print(f"[ERROR] {name} failed: {error}")
+        if name in resource_map and on_result:
+            # Hand each result over as soon as it resolves (used by the /stream endpoint)
+            on_result(name, result if error is None else [], str(error) if error is not None else None)
+
+    scheduler.run(on_done)
+    if scheduler.cancelled:
+        print(f"[INFO] {labels[0]}/{labels[1]} cancelled before start: {', '.join(sorted(scheduler.cancelled))}")
+
+    report = scheduler.report()
+    for task in report['tasks']:
+        if task['task'] in live:
+            estimates[task['task']] = task['seconds']
+    SCHEDULE_REPORTS[labels] = {"profile": labels[0], "region": labels[1],
+                                "finished_at": datetime.now().isoformat(timespec='seconds'), **report}
+    critical_path = " -> ".join(f"{task['task']} ({task['seconds']}s)" for task in report['critical_path'])
+    print(f"[INFO] {labels[0]}/{labels[1]} collected in {report['elapsed_seconds']}s, critical path: {critical_path}")
+
+    return {key: scheduler.results.get(key, []) for key in resource_map}
+
+def collect_region(profile, region, semaphore=None, refresh=False, progress=None, scope=None):
+    session = get_session(profile, session_region(region))
+    context = CollectionContext(session)
+    # Inventory and detail collectors share one graph, so detail sheets no longer wait for the whole inventory
+    resource_map = scoped({**RESOURCE_MAP, **DETAIL_RESOURCE_MAP}, scope)
+    results = schedule_collectors(resource_map, session, context, semaphore=semaphore,
+                                  refresh=refresh, progress=progress, region=region)
+    inventory_data = {key: results[key] for key in RESOURCE_MAP if key in results}
+    detail_data = {key: results[key] for key in DETAIL_RESOURCE_MAP if key in results}
+    return inventory_data, detail_data
+
+def collect_resource(profile, region, resource):
+    # region may be GLOBAL_REGION (background refresh of a global snapshot)
+    session = get_session(profile, session_region(region))
+    func = RESOURCE_MAP.get(resource) or SUMMARY_RESOURCE_MAP[resource]
+    return collect_snapshot(profile, resource_region(resource, region), resource, func,
+                            session, CollectionContext(session))
+
+def serve_snapshot(profile, region, resource, refresh=False):
+    # Newest snapshot for the dashboard (/api and /stream): a stale one is served as-is while a background
+    # refresh collects a new one. None when there is none (or refresh is asked): the caller collects live
+    snapshot_region = resource_region(resource, region)
+    snapshot = None if refresh else SNAPSHOT_STORE.latest(profile, snapshot_region, resource)
+    if snapshot is not None and not snapshot.is_fresh:
+        SNAPSHOT_STORE.refresh_async(profile, snapshot_region, resource, collect_resource)
+    return snapshot
+
+def snapshot_info(profile, region, resource, snapshot=None):
+    # Age / freshness shown next to each dashboard tab (newest stored snapshot when none is given)
+    snapshot_region = resource_region(resource, region)
+    info = snapshot.describe() if snapshot is not None else SNAPSHOT_STORE.describe_latest(profile, snapshot_region, resource)
+    if info is None:
+        return None
+    return {**info, "refreshing": SNAPSHOT_STORE.is_refreshing(profile, snapshot_region, resource)}
+
+def collect_all_regions(profile, regions, refresh=False, progress=None):
+    # Regions run side by side with their regional collectors only; global collectors run once
+    # as their own "global" entry. The shared semaphore bounds total in-flight collectors
+    semaphore = BoundedSemaphore(GLOBAL_MAX_WORKERS)
+    region_results = {}
+    targets = [(region, "regional") for region in regions] + [(GLOBAL_REGION, "global")]
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = {
+            executor.submit(collect_region, profile, region, semaphore, refresh, progress, scope): region
+            for region, scope in targets
+        }
+        for future in as_completed(futures):
+            region = futures[future]
+            try:
+                region_results[region] = future.result()
+            except Exception as e:
+                print(f"[ERROR] region {region} failed: {e}")
+    # Keep REGION_LIST order in the merged output, global collectors last
+    return {region: region_results[region] for region, _ in targets if region in region_results}
+
+def with_label_column(rows, column, label):
+    # Rows that already carry the column (e.g. S3 bucket Region) keep their own value
+    return [{column: label, **row} for row in rows]
+
+def merge_results(results, column):
+    inventory_data = {}
+    sg_frames = ([], [], [])
+
+    for label, (inventory, detail) in results.items():
+        for key, rows in inventory.items():
+            inventory_data.setdefault(key, []).extend(with_label_column(rows, column, label))
+
+        sg_detail = detail.get("security-groups-details")
+        if isinstance(sg_detail, tuple):
+            for frames, df in zip(sg_frames, sg_detail):
+                df = pd.DataFrame(df)
+                if df.empty:
+                    continue
+                if column not in df.columns:
+                    df.insert(0, column, label)
+                frames.append(df)
+
+    sg_detail_data = tuple(
+        pd.concat(frames, ignore_index=True) if frames else pd.DataFrame() for frames in sg_frames
+    ) if any(sg_frames) else []
+
+    return inventory_data, {"security-groups-details": sg_detail_data}
+
+def merge_region_results(region_results):
+    inventory_data, detail_data = merge_results(region_results, 'Region')
+
+    # Route53 is a global service, collected once under the "global" entry
+    detail_data["route53-details"] = next(
+        (detail.get("route53-details") for _, detail in region_results.values() if detail.get("route53-details")),
+        {}
+    )
+    return inventory_data, detail_data
+
+def build_inventory_files(file_prefix, inventory_data, detail_data):
+    excel_files = []
+
+    # # Inventory Excel
+    if any(inventory_data.values()):
+        inventory_excel = save_excel_from_data(inventory_data, sheet_order=list(RESOURCE_MAP.keys()))
+        excel_files.append((inventory_excel, f"{file_prefix}_inventory.xlsx"))
+    else:
+        print("[INFO] No Inventory data found. Skipping Inventory Excel.")
+
+    # SG Detail Excel
+    sg_raw = detail_data.get("security-groups-details", [])
+    if sg_raw:
+        sg_data = {"security-groups-details": sg_raw}
+        sg_excel = save_excel_from_data(sg_data, sheet_order=["security-groups-details"])
+        excel_files.append((sg_excel, f"{file_prefix}_detail_sg.xlsx"))
+    else:
+        print("[INFO] No Security Group data found. Skipping SG Excel.")
+
+    # Route53 Excel
+    route53_data = detail_data.get("route53-details", {})
+    has_route53_data = any(not df.empty for df in route53_data.values()) if route53_data else False
+
+    if has_route53_data:
+        with NamedTemporaryFile(delete=False, suffix=".xlsx") as route53_tmp:
+            save_excel_with_format(route53_data, route53_tmp.name)
+            excel_files.append((route53_tmp.name, f"{file_prefix}_route53.xlsx"))
+    else:
+        print("[INFO] No Route53 data found in any sheet. Skipping Route53 Excel.")
+
+    return excel_files
+
+def write_zip(excel_files):
+    # ZIP Compression
+    with NamedTemporaryFile(delete=False, suffix=".zip") as tmp_zip:
+        with zipfile.ZipFile(tmp_zip.name, 'w') as zipf:
+            if not excel_files:
+                print("[WARNING] No Excel files generated. Returning empty zip.")
+            for file_path, arc_name in excel_files:
+                zipf.write(file_path, arcname=arc_name)
+
+    # Delete temporary Excel file
+    for file_path, _ in excel_files:
+        os.remove(file_path)
+
+    return tmp_zip.name
+
+def build_inventory_zip(file_prefix, inventory_data, detail_data):
+    return write_zip(build_inventory_files(file_prefix, inventory_data, detail_data))
+
+def with_service_limit(semaphore, fn, *args):
+    with semaphore:
+        return fn(*args)
+
+def collect_accounts(profiles, region, refresh=False, progress=None):
+    # Every (account, collector) pair is a task; the fair scheduler interleaves accounts and each
+    # account keeps the same per-service caps (SERVICE_MAX_WORKERS) as a single-region run
+    account_results = {profile: ({}, {}) for profile in profiles}
+    futures = {}
+    with FairScheduler(GLOBAL_MAX_WORKERS, ACCOUNT_MAX_WORKERS) as scheduler:
+        for profile in profiles:
+            try:
+                session = get_session(profile, region)
+            except Exception as e:
+                print(f"[ERROR] profile {profile} failed: {e}")
+                continue
+            context = CollectionContext(session)
+            service_semaphores = {}
+            for target, resource_map in zip(account_results[profile], (RESOURCE_MAP, DETAIL_RESOURCE_MAP)):
+                for key, func in resource_map.items():
+                    service = COLLECTOR_DEPENDENCIES.get(key, (key, []))[0]
+                    semaphore = service_semaphores.setdefault(
+                        service, BoundedSemaphore(SERVICE_MAX_WORKERS.get(service, DEFAULT_SERVICE_MAX_WORKERS))
+                    )
+                    futures[scheduler.submit(profile, with_service_limit, semaphore, run_collector,
+                                             key, func, session, context, refresh, progress)] = (profile, target, key)
+
         for future in as_completed(futures):
-            key = futures[future]
+            profile, target, key = futures[future]
             try:
-                results[key] = future.result()
+                target[key] = future.result()
             except Exception as e:
-                print(f"[ERROR] {key} failed: {e}")
-                results[key] = []
-    return results
+                print(f"[ERROR] {profile} {key} failed: {e}")
+                target[key] = []
+    return account_results
+
+def build_accounts_zip(account_results):
+    excel_files = []
+
+    # Per-account workbooks, one folder per profile
+    for profile, (inventory_data, detail_data) in account_results.items():
+        for file_path, arc_name in build_inventory_files(profile, inventory_data, detail_data):
+            excel_files.append((file_path, f"{profile}/{arc_name}"))
+
+    # Consolidated cross-account workbooks (Route53 zones stay per account)
+    inventory_data, detail_data = merge_results(account_results, 'Profile')
+    excel_files.extend(build_inventory_files("all_accounts", inventory_data, detail_data))
+
+    return write_zip(excel_files)
 
 def save_excel_from_data(data_dict, sheet_order):
     
@@ -313,79 +707,233 @@ def get_resource(resource):
 
     profile = request.args.get("profile", "sightmind-prod")
     region = request.args.get("region", "us-east-1")
+    refresh = request.args.get("refresh") == "1"
+    if request.args.get("summary") == "1" and f"{resource}-summary" in SUMMARY_RESOURCE_MAP:
+        resource = f"{resource}-summary"
     try:
-        session = boto3.Session(profile_name=profile, region_name=region)
-        result = RESOURCE_MAP[resource](session)
+        # Global collectors share one snapshot across regions
+        snapshot = serve_snapshot(profile, region, resource, refresh)
+        if snapshot is None:
+            snapshot = collect_resource(profile, region, resource)
+
+        result = snapshot.data
         print(f"[DEBUG] {resource} result: {result}")
-        if not result:
-            return jsonify({"columns": [], "rows": []})
-        
-        columns = list(result[0].keys())
-        rows = [list(item.values()) for item in result]
-        return jsonify({"columns": columns, "rows": rows})
+        columns, rows = to_table(result)
+        return jsonify({"columns": columns, "rows": rows, "snapshot": snapshot_info(profile, region, resource, snapshot)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/download/selected')
-def selected_region_download():
-    profile = request.args.get("profile")
-    region = request.args.get("region")
-    if not profile or not region:
-        return "Profile & Region is required", 400
+def to_table(result):
+    if not result:
+        return [], []
+    columns = list(result[0].keys())
+    rows = [list(item.values()) for item in result]
+    return columns, rows
+
+def sse_event(event, data):
+    # Same JSON encoding as jsonify, so streamed rows look exactly like /api rows
+    return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+@app.route('/stream')
+def stream_resources():
+    """
+    Server-Sent Events feed of every RESOURCE_MAP collector for one profile/region.
+    Emits a "resource" event (columns/rows and snapshot age, or error) as each collector finishes and a
+    final "done" event. Stored snapshots are served like /api does: right away, stale ones refreshed in the background.
+    """
+    profile = request.args.get("profile", "sightmind-prod")
+    region = request.args.get("region", "us-east-1")
+    refresh = request.args.get("refresh") == "1"
+    events = queue.Queue()
+    # Set when the client goes away (EventSource closed on a profile/region switch): collectors that
+    # have not started yet are dropped, running ones finish and still leave fresh snapshots behind
+    cancel = Event()
 
+    def collect():
+        try:
+            live = {}
+            for key, func in RESOURCE_MAP.items():
+                snapshot = serve_snapshot(profile, region, key, refresh)
+                if snapshot is None:
+                    live[key] = func
+                else:
+                    events.put((key, snapshot.data, None, snapshot_info(profile, region, key, snapshot)))
+            if live:
+                session = get_session(profile, region)
+                schedule_collectors(live, session, refresh=refresh, cancel=cancel,
+                                    on_result=lambda key, data, error: events.put(
+                                        (key, data, error, snapshot_info(profile, region, key) if error is None else None)))
+        except Exception as e:
+            print(f"[ERROR] stream {profile}/{region} failed: {e}")
+            events.put((None, None, str(e), None))
+        finally:
+            events.put(None)
+
+    def generate():
+        started = time.monotonic()
+        done = 0
+        total = len(RESOURCE_MAP)
+        try:
+            yield sse_event("start", {"profile": profile, "region": region, "resources": list(RESOURCE_MAP.keys())})
+            while True:
+                try:
+                    item = events.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                key, data, error, snapshot = item
+                if key is None:
+                    yield sse_event("failed", {"error": error})
+                    continue
+                done += 1
+                columns, rows = to_table(data)
+                yield sse_event("resource", {
+                    "resource": key, "columns": columns, "rows": rows, "error": error, "snapshot": snapshot,
+                    "progress": {"done": done, "total": total}
+                })
+            yield sse_event("done", {"progress": {"done": done, "total": total},
+                                     "elapsed_seconds": round(time.monotonic() - started, 2)})
+        except GeneratorExit:
+            # Client disconnected: stop starting new collectors for this stream
+            cancel.set()
+            raise
+
+    Thread(target=collect, daemon=True).start()
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/stats/rate-limits')
+def rate_limit_stats():
+    return jsonify(RATE_LIMITER.stats())
+
+@app.route('/stats/pagination')
+def pagination_stats():
+    return jsonify(PAGE_STATS.stats())
+
+@app.route('/stats/schedule')
+def schedule_stats():
+    return jsonify(list(SCHEDULE_REPORTS.values()))
+
+def resolve_download(mode, args):
+    """
+    Validate download parameters for a mode ("selected", "all" or "accounts").
+    Returns (key, total collectors, build) where build(progress=None) returns (zip path, download name).
+    The key identifies identical downloads for job dedup; refresh=1 is part of it, so a forced refresh
+    never gets back a job that serves snapshots.
+    Raises ValueError on invalid parameters and KeyError on an unknown mode.
+    """
+    refresh = args.get("refresh") == "1"
+    collectors = len(RESOURCE_MAP) + len(DETAIL_RESOURCE_MAP)
+    today = datetime.now().strftime('%y_%m_%d')
+
+    if mode == "selected":
+        profile = args.get("profile")
+        region = args.get("region")
+        if not profile or not region:
+            raise ValueError("Profile & Region is required")
+
+        def build(progress=None):
+            # Collect Data (fresh snapshots are reused unless refresh=1)
+            inventory_data, detail_data = collect_region(profile, region, refresh=refresh, progress=progress)
+            zip_path = build_inventory_zip(profile, inventory_data, detail_data)
+            return zip_path, f"{profile}_aws_inventory_{today}.zip"
+
+        return (mode, profile, region, refresh), collectors, build
+
+    if mode == "all":
+        profile = args.get("profile")
+        if not profile:
+            raise ValueError("Profile is required")
+        regions = [r for r in args.get("regions", "").split(",") if r] or REGION_LIST
+        unknown = [r for r in regions if r not in REGION_LIST]
+        if unknown:
+            raise ValueError(f"Unsupported region: {', '.join(unknown)}")
+
+        def build(progress=None):
+            # Collect Data (all regions concurrently, merged with a Region column)
+            region_results = collect_all_regions(profile, regions, refresh, progress)
+            inventory_data, detail_data = merge_region_results(region_results)
+            zip_path = build_inventory_zip(f"{profile}_all_regions", inventory_data, detail_data)
+            return zip_path, f"{profile}_aws_inventory_all_regions_{today}.zip"
+
+        global_collectors = len(scoped({**RESOURCE_MAP, **DETAIL_RESOURCE_MAP}, "global"))
+        total = (collectors - global_collectors) * len(regions) + global_collectors
+        return (mode, profile, tuple(regions), refresh), total, build
+
+    if mode == "accounts":
+        region = args.get("region")
+        requested = args.get("profiles", "all")
+        if not region:
+            raise ValueError("Region is required")
+        available = get_aws_profiles()
+        profiles = available if requested == "all" else [p for p in requested.split(",") if p]
+        unknown = [p for p in profiles if p not in available]
+        if not profiles:
+            raise ValueError("No profiles selected")
+        if unknown:
+            raise ValueError(f"Unknown profile: {', '.join(unknown)}")
+
+        def build(progress=None):
+            # Collect Data (all selected accounts in parallel)
+            account_results = collect_accounts(profiles, region, refresh, progress)
+            zip_path = build_accounts_zip(account_results)
+            return zip_path, f"all_accounts_{region}_aws_inventory_{today}.zip"
+
+        return (mode, tuple(profiles), region, refresh), collectors * len(profiles), build
+
+    raise KeyError(mode)
+
+@app.route('/download/<mode>')
+def download(mode):
     try:
-        session = boto3.Session(profile_name=profile, region_name=region)
-
-        # Collect Data
-        inventory_data = parallel_execute(RESOURCE_MAP, session)
-        detail_data = parallel_execute(DETAIL_RESOURCE_MAP, session)
-
-        excel_files = []
-
-        # # Inventory Excel
-        if any(inventory_data.values()):
-            inventory_excel = save_excel_from_data(inventory_data, sheet_order=list(RESOURCE_MAP.keys()))
-            excel_files.append((inventory_excel, f"{profile}_inventory.xlsx"))
-        else:
-            print("[INFO] No Inventory data found. Skipping Inventory Excel.")
-
-        # SG Detail Excel
-        sg_raw = detail_data.get("security-groups-details", [])
-        if sg_raw:
-            sg_data = {"security-groups-details": sg_raw}
-            sg_excel = save_excel_from_data(sg_data, sheet_order=["security-groups-details"])
-            excel_files.append((sg_excel, f"{profile}_detail_sg.xlsx"))
-        else:
-            print("[INFO] No Security Group data found. Skipping SG Excel.")
-
-        # Route53 Excel
-        route53_data = detail_data.get("route53-details", {})
-        has_route53_data = any(not df.empty for df in route53_data.values()) if route53_data else False
-
-        if has_route53_data:
-            with NamedTemporaryFile(delete=False, suffix=".xlsx") as route53_tmp:
-                save_excel_with_format(route53_data, route53_tmp.name)
-                excel_files.append((route53_tmp.name, f"{profile}_route53.xlsx"))
-        else:
-            print("[INFO] No Route53 data found in any sheet. Skipping Route53 Excel.")
-
-        # ZIP Compression
-        with NamedTemporaryFile(delete=False, suffix=".zip") as tmp_zip:
-            with zipfile.ZipFile(tmp_zip.name, 'w') as zipf:
-                if not excel_files:
-                    print("[WARNING] No Excel files generated. Returning empty zip.")
-                for file_path, arc_name in excel_files:
-                    zipf.write(file_path, arcname=arc_name)
-
-        # Delete temporary Excel file
-        for file_path, _ in excel_files:
-            os.remove(file_path)
-
-        return send_file(tmp_zip.name, download_name=f"{profile}_aws_inventory_{datetime.now().strftime('%y_%m_%d')}.zip", as_attachment=True)
+        _, _, build = resolve_download(mode, request.args)
+    except KeyError:
+        return "Unsupported download type", 404
+    except ValueError as e:
+        return str(e), 400
 
+    try:
+        zip_path, download_name = build()
+        return send_file(zip_path, download_name=download_name, as_attachment=True)
     except Exception as e:
         return str(e), 500
 
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    args = request.get_json(silent=True) or request.form or request.args
+    mode = args.get("mode", "selected")
+    try:
+        key, total, build = resolve_download(mode, args)
+        job, created = JOB_MANAGER.submit(key, total, build)
+    except KeyError:
+        return jsonify({"error": "Unsupported download type"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+
+    # An identical sweep already queued or running is shared instead of started twice
+    return jsonify({**job.to_dict(), "created": created}), 202 if created else 200
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/artifact')
+def get_job_artifact(job_id):
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        return "Job not found or expired", 404
+    if job.status != 'succeeded':
+        return f"Job is {job.status}", 409
+    return send_file(job.artifact_path, download_name=job.download_name, as_attachment=True)
+
 @app.route('/')
 def index():
     profiles = get_aws_profiles()
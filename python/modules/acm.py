@@ -1,14 +1,23 @@
-from modules.common import exponential_backoff
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_acm_certificates(session):
-    client = session.client('acm')
-    certs = exponential_backoff(client.list_certificates).get("CertificateSummaryList", [])
+def list_acm_certificates(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('acm')
+    certs = fetch_all(client, 'list_certificates', "CertificateSummaryList")
+
+    # describe_certificate 병렬 조회 (인증서별 실패는 해당 행만 '-' 처리)
+    details = fan_out(
+        'acm', lambda cert: client.describe_certificate(CertificateArn=cert["CertificateArn"]), certs,
+        label=lambda cert: cert.get("CertificateArn")
+    )
 
     result = []
 
-    for cert in certs:
+    for cert, response, _ in details:
         cert_arn = cert.get("CertificateArn", "-")
-        cert_info = exponential_backoff(client.describe_certificate, CertificateArn=cert_arn).get("Certificate", {})
+        cert_info = (response or {}).get("Certificate", {})
 
         # datetime 변환 처리
         issued_at = cert_info.get("IssuedAt")
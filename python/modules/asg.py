@@ -1,92 +1,91 @@
-from modules.common import exponential_backoff
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_auto_scaling_groups(session):
+def list_auto_scaling_groups(session, context=None):
+    context = context or CollectionContext(session)
     asg_data = []
     try:
-        asg_client = session.client('autoscaling')
-        ec2_client = session.client('ec2')
-        elb_client = session.client('elbv2')
+        asg_client = context.client('autoscaling')
 
-        # Subnet ID → Name 매핑
-        subnet_name_map = {}
-        subnets = exponential_backoff(ec2_client.describe_subnets)
-        for subnet in subnets['Subnets']:
-            subnet_id = subnet['SubnetId']
-            name_tag = next((tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'), '-')
-            subnet_name_map[subnet_id] = name_tag
+        # Subnet ID → Name 매핑 (공유 컨텍스트)
+        subnet_name_map = context.subnet_name_map
 
-        paginator = asg_client.get_paginator('describe_auto_scaling_groups')
-        response_iterator = paginator.paginate()
+        asgs = fetch_all(asg_client, 'describe_auto_scaling_groups', 'AutoScalingGroups')
 
-        for response in response_iterator:
-            for asg in response['AutoScalingGroups']:
-                name = asg['AutoScalingGroupName']
+        # 멤버 인스턴스: 공유 컨텍스트에 없는 것만 일괄 조회
+        member_ids = {instance['InstanceId'] for asg in asgs for instance in asg['Instances']}
+        instance_by_id = context.find_instances(member_ids)
 
-                # Launch Template or Launch Configuration
-                if 'LaunchTemplate' in asg:
-                    lt = asg['LaunchTemplate']
-                    launch_template = f"{lt['LaunchTemplateName']} (Version: {lt['Version']})"
-                else:
-                    launch_template = asg.get('LaunchConfigurationName', '-')
+        # Target Group ARN → 이름 (공유 컨텍스트의 Target Group 인덱스, 필요할 때만 조회)
+        target_group_by_arn = context.target_group_by_arn if any(asg.get('TargetGroupARNs') for asg in asgs) else {}
 
-                # Instance Info
-                instances_details, instance_types, ami_ids = [], [], []
-                security_groups_set = set()
+        for asg in asgs:
+            name = asg['AutoScalingGroupName']
 
-                for instance in asg['Instances']:
-                    instance_id = instance['InstanceId']
-                    try:
-                        instance_info = exponential_backoff(ec2_client.describe_instances, InstanceIds=[instance_id])
-                        inst = instance_info['Reservations'][0]['Instances'][0]
-                        instance_types.append(inst['InstanceType'])
-                        ami_ids.append(inst['ImageId'])
-                        sg_ids = [sg['GroupId'] for sg in inst.get('SecurityGroups', [])]
-                        security_groups_set.update(sg_ids)
-                        instances_details.append(instance_id)
-                    except Exception as e:
-                        print(f"Error retrieving instance info for {instance_id}: {e}")
+            # Launch Template or Launch Configuration
+            if 'LaunchTemplate' in asg:
+                lt = asg['LaunchTemplate']
+                launch_template = f"{lt['LaunchTemplateName']} (Version: {lt['Version']})"
+            else:
+                launch_template = asg.get('LaunchConfigurationName', '-')
 
-                instances_str = ', '.join(instances_details)
-                instance_types_str = ', '.join(instance_types)
-                ami_ids_str = ', '.join(ami_ids)
-                security_groups_str = ', '.join(security_groups_set)
-                desired_capacity = asg['DesiredCapacity']
-                min_size = asg['MinSize']
-                max_size = asg['MaxSize']
-                availability_zones = ', '.join(asg['AvailabilityZones'])
+            # Instance Info
+            instances_details, instance_types, ami_ids = [], [], []
+            security_groups_set = set()
 
-                # Target Groups
-                target_groups = []
-                for tg_arn in asg.get('TargetGroupARNs', []):
-                    try:
-                        tg_info = exponential_backoff(elb_client.describe_target_groups, TargetGroupArns=[tg_arn])
-                        tg_name = tg_info['TargetGroups'][0]['TargetGroupName']
-                        target_groups.append(tg_name)
-                    except Exception as e:
-                        print(f"Error retrieving target group info for {tg_arn}: {e}")
-                target_groups_str = ', '.join(target_groups)
+            for instance in asg['Instances']:
+                instance_id = instance['InstanceId']
+                inst = instance_by_id.get(instance_id)
+                if not inst:
+                    print(f"Error retrieving instance info for {instance_id}: not found")
+                    continue
+                instance_types.append(inst['InstanceType'])
+                ami_ids.append(inst['ImageId'])
+                sg_ids = [sg['GroupId'] for sg in inst.get('SecurityGroups', [])]
+                security_groups_set.update(sg_ids)
+                instances_details.append(instance_id)
 
-                # Subnet IDs + Names (separate fields)
-                raw_subnet_ids = [sid for sid in asg.get('VPCZoneIdentifier', '').split(',') if sid]
-                subnet_ids_str = ', '.join(raw_subnet_ids)
-                subnet_names_str = ', '.join([subnet_name_map.get(sid, '-') for sid in raw_subnet_ids])
+            instances_str = ', '.join(instances_details)
+            instance_types_str = ', '.join(instance_types)
+            ami_ids_str = ', '.join(ami_ids)
+            security_groups_str = ', '.join(security_groups_set)
+            desired_capacity = asg['DesiredCapacity']
+            min_size = asg['MinSize']
+            max_size = asg['MaxSize']
+            availability_zones = ', '.join(asg['AvailabilityZones'])
 
-                asg_data.append({
-                    'Name': name,
-                    'Launch template/configuration': launch_template,
-                    'Instances': instances_str,
-                    'Instance Type': instance_types_str,
-                    'AMI ID': ami_ids_str,
-                    'Security Group ID': security_groups_str,
-                    'Load Balancer Target Groups': target_groups_str,
-                    'AZ': availability_zones,
-                    'Subnet ID': subnet_ids_str,
-                    'Subnet Name': subnet_names_str,
-                    'Desired Capacity': desired_capacity,
-                    'Min': min_size,
-                    'Max': max_size
-                })
+            # Target Groups
+            target_groups = []
+            for tg_arn in asg.get('TargetGroupARNs', []):
+                tg_info = target_group_by_arn.get(tg_arn)
+                if tg_info is None:
+                    print(f"Error retrieving target group info for {tg_arn}: not found")
+                    continue
+                target_groups.append(tg_info['TargetGroupName'])
+            target_groups_str = ', '.join(target_groups)
+
+            # Subnet IDs + Names (separate fields)
+            raw_subnet_ids = [sid for sid in asg.get('VPCZoneIdentifier', '').split(',') if sid]
+            subnet_ids_str = ', '.join(raw_subnet_ids)
+            subnet_names_str = ', '.join([subnet_name_map.get(sid, '-') for sid in raw_subnet_ids])
+
+            asg_data.append({
+                'Name': name,
+                'Launch template/configuration': launch_template,
+                'Instances': instances_str,
+                'Instance Type': instance_types_str,
+                'AMI ID': ami_ids_str,
+                'Security Group ID': security_groups_str,
+                'Load Balancer Target Groups': target_groups_str,
+                'AZ': availability_zones,
+                'Subnet ID': subnet_ids_str,
+                'Subnet Name': subnet_names_str,
+                'Desired Capacity': desired_capacity,
+                'Min': min_size,
+                'Max': max_size
+            })
 
     except Exception as e:
         print(f"Error retrieving Auto Scaling Groups: {e}")
+        raise
     return asg_data
@@ -0,0 +1,163 @@
+import threading
+import weakref
+import boto3
+import botocore.session
+from botocore.config import Config
+from botocore.loaders import create_loader
+from modules.rate_limiter import RATE_LIMITER
+
+# Collectors fan out on up to REGION_MAX_WORKERS threads per region and several of them share a client,
+# so the urllib3 pool must be larger than botocore's default of 10 to keep connections alive and reused.
+CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'standard'}
+)
+
+
+def _profile_key(profile_name):
+    # boto3 reports 'default' for sessions created without a profile
+    return None if profile_name in (None, 'default') else profile_name
+
+
+class ClientPool:
+    """
+    Process-wide cache of boto3 sessions and clients keyed by (profile, region[, service]).
+
+    Creating a client loads botocore service models and opens a new connection pool, so every
+    request used to pay for model parsing and TLS handshakes. Sessions share one data loader
+    (service models are parsed once per process) and clients are reused until the profile's
+    credentials expire, at which point every entry for that profile is evicted and rebuilt.
+
+    Sessions and clients are created under a lock of their own key only, so slow creation or
+    credential refreshes for one profile/region do not hold up the others. Sessions the pool
+    did not create (assumed roles, injected credentials) keep their own credentials: their
+    clients are cached per session object.
+    """
+
+    def __init__(self, config=CLIENT_CONFIG):
+        self._config = config
+        # Guards the dictionaries below only; never held while creating sessions or clients
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._loader = create_loader()
+        self._sessions = {}
+        self._clients = {}
+        self._pooled = weakref.WeakSet()
+        self._session_clients = weakref.WeakKeyDictionary()
+        self._accounts = {}
+        self._session_accounts = weakref.WeakKeyDictionary()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def session(self, profile_name=None, region_name=None):
+        profile_name = _profile_key(profile_name)
+        key = (profile_name, region_name)
+        with self._key_lock(key):
+            with self._lock:
+                session = self._sessions.get(key)
+            if session is not None and self._credentials_expired(session):
+                self.evict(profile_name)
+                session = None
+            if session is None:
+                botocore_session = botocore.session.get_session()
+                botocore_session.register_component('data_loader', self._loader)
+                session = boto3.Session(
+                    botocore_session=botocore_session,
+                    profile_name=profile_name,
+                    region_name=region_name
+                )
+                with self._lock:
+                    self._sessions[key] = session
+                    self._pooled.add(session)
+            return session
+
+    def client(self, session, service_name, region_name=None):
+        region_name = region_name or session.region_name
+        if session not in self._pooled:
+            return self._session_client(session, service_name, region_name)
+
+        profile_name = _profile_key(session.profile_name)
+        key = (profile_name, region_name, service_name)
+        with self._key_lock(key):
+            # session() evicts this profile's clients as well when its credentials have expired
+            pooled_session = self.session(profile_name, region_name)
+            with self._lock:
+                client = self._clients.get(key)
+            if client is None:
+                client = pooled_session.client(service_name, config=self._config)
+                # Every pooled client takes tokens from the shared adaptive limiter before each attempt
+                RATE_LIMITER.register(client, self._account_resolver(pooled_session, self._accounts, profile_name))
+                with self._lock:
+                    self._clients[key] = client
+            return client
+
+    def _session_client(self, session, service_name, region_name):
+        # Caller-built session: reuse it as-is, created outside the lock and inserted with a second check
+        key = (region_name, service_name)
+        with self._lock:
+            client = self._session_clients.get(session, {}).get(key)
+        if client is None:
+            created = session.client(service_name, region_name=region_name, config=self._config)
+            RATE_LIMITER.register(created, self._account_resolver(session, self._session_accounts, session))
+            with self._lock:
+                client = self._session_clients.setdefault(session, {}).setdefault(key, created)
+        return client
+
+    def _account_resolver(self, session, cache, key):
+        # Rate limit buckets are per account: several profiles (roles) of one account share its API limits.
+        # Looked up once per profile / caller-built session with a client outside the limiter; a failed
+        # lookup keys the buckets by profile name instead
+        def resolve():
+            with self._lock:
+                account = cache.get(key)
+            if account is None:
+                try:
+                    account = session.client('sts', config=self._config).get_caller_identity()['Account']
+                except Exception as e:
+                    account = _profile_key(session.profile_name) or 'default'
+                    print(f"[INFO] Rate limits for {account} keyed by profile: account lookup failed: {e}")
+                with self._lock:
+                    account = cache.setdefault(key, account)
+            return account
+        return resolve
+
+    def evict(self, profile_name=None):
+        profile_name = _profile_key(profile_name)
+        with self._lock:
+            for key in [k for k in self._sessions if k[0] == profile_name]:
+                del self._sessions[key]
+            for key in [k for k in self._clients if k[0] == profile_name]:
+                del self._clients[key]
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+            self._session_clients.clear()
+            self._accounts.clear()
+            self._session_accounts.clear()
+
+    @staticmethod
+    def _credentials_expired(session):
+        try:
+            credentials = session.get_credentials()
+        except Exception:
+            return True
+        if credentials is None:
+            return True
+        refresh_needed = getattr(credentials, 'refresh_needed', None)
+        return bool(refresh_needed and refresh_needed(refresh_in=0))
+
+
+CLIENT_POOL = ClientPool()
+
+
+def get_session(profile_name=None, region_name=None):
+    return CLIENT_POOL.session(profile_name, region_name)
+
+
+def get_client(session, service_name, region_name=None):
+    return CLIENT_POOL.client(session, service_name, region_name)
@@ -1,13 +1,12 @@
-from modules.common import exponential_backoff
+from modules.paginate import paginate
+from modules.context import CollectionContext
 
-def list_cloudfront_distributions(session):
+def list_cloudfront_distributions(session, context=None):
+    context = context or CollectionContext(session)
     cloudfront_data = []
     try:
-        cloudfront_client = session.client('cloudfront')
-        paginator = cloudfront_client.get_paginator('list_distributions')
-        response_iterator = paginator.paginate()
-
-        for response in response_iterator:
+        cloudfront_client = context.client('cloudfront')
+        for response in paginate(cloudfront_client, 'list_distributions'):
             distributions = response.get('DistributionList', {}).get('Items', [])
 
             for distribution in distributions:
@@ -38,4 +37,5 @@ def list_cloudfront_distributions(session):
 
     except Exception as e:
         print(f"Error retrieving CloudFront distributions: {e}")
+        raise
     return cloudfront_data
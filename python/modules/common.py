@@ -1,19 +1,35 @@
 import time
 import random
 
-def exponential_backoff(func, max_attempts=5, *args, **kwargs):
+THROTTLE_ERROR_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+    'TooManyRequestsException', 'RequestThrottled', 'RequestThrottledException',
+    'SlowDown', 'PriorRequestNotComplete', 'EC2ThrottledException'
+}
+
+def is_throttle_error(e):
+    return getattr(e, 'response', {}).get('Error', {}).get('Code') in THROTTLE_ERROR_CODES
+
+def exponential_backoff(func, *args, max_attempts=5, **kwargs):
+    # Pacing is done by the shared rate limiter (modules.rate_limiter) hooked into every pooled client,
+    # which already retries throttled requests. This only retries calls that stayed throttled after that,
+    # with a short jitter so threads don't retry in lockstep.
     attempt = 0
-    while attempt < max_attempts:
+    while True:
         try:
             return func(*args, **kwargs)
         except Exception as e:
             # Only retry for throttling errors
-            if getattr(e, 'response', {}).get('Error', {}).get('Code') in ['Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'TooManyRequestsException']:
-                attempt += 1
-                if attempt == max_attempts:
-                    raise e
-                sleep_time = min((2 ** attempt) + random.uniform(0, 1), 30)  # Limit sleep to 30 seconds
-                print(f"Attempt {attempt} failed: {e}. Retrying in {sleep_time:.2f} seconds...")
-                time.sleep(sleep_time)
-            else:
+            if not is_throttle_error(e):
                 raise e
+            attempt += 1
+            if attempt >= max_attempts:
+                raise e
+            sleep_time = random.uniform(0, min(2 ** attempt, 5))
+            print(f"Attempt {attempt} failed: {e}. Retrying in {sleep_time:.2f} seconds...")
+            time.sleep(sleep_time)
+
+def chunked(items, size):
+    # Split a list into consecutive batches of at most `size` items (API batch limits)
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
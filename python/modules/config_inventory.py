@@ -0,0 +1,203 @@
+import os
+import json
+import re
+import threading
+import time
+from datetime import datetime
+from modules.client_pool import get_session, get_client
+from modules.paginate import fetch_all
+
+# AWS Config advanced query backend for the shared EC2 reference datasets, used whenever Config has
+# them (datasets it does not record, or records late, fall back to describe_* calls).
+# INVENTORY_CONFIG_FAST_PATH=0 turns it off; INVENTORY_CONFIG_AGGREGATOR queries an (organization)
+# aggregator instead of each account's own recorder, with the credentials of
+# INVENTORY_CONFIG_AGGREGATOR_PROFILE (the aggregator account) in INVENTORY_CONFIG_AGGREGATOR_REGION.
+CONFIG_FAST_PATH = os.environ.get("INVENTORY_CONFIG_FAST_PATH", "1") != "0"
+CONFIG_AGGREGATOR = os.environ.get("INVENTORY_CONFIG_AGGREGATOR")
+CONFIG_AGGREGATOR_PROFILE = os.environ.get("INVENTORY_CONFIG_AGGREGATOR_PROFILE")
+CONFIG_AGGREGATOR_REGION = os.environ.get("INVENTORY_CONFIG_AGGREGATOR_REGION")
+# Seconds one aggregator query serves every account / region context (one query per collection run)
+CONFIG_AGGREGATOR_MAX_AGE = int(os.environ.get("INVENTORY_CONFIG_AGGREGATOR_MAX_AGE", "600"))
+
+# CollectionContext dataset → Config resource type
+CONFIG_RESOURCE_TYPES = {
+    "subnets": "AWS::EC2::Subnet",
+    "instances": "AWS::EC2::Instance",
+    "volumes": "AWS::EC2::Volume",
+    "security_groups": "AWS::EC2::SecurityGroup",
+    "network_interfaces": "AWS::EC2::NetworkInterface",
+    "route_tables": "AWS::EC2::RouteTable",
+    "network_acls": "AWS::EC2::NetworkAcl",
+}
+
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d+)?(Z|[+-]\d\d:?\d\d)$')
+
+
+def to_api_shape(value, key=''):
+    # Config stores the describe_* response in lowerCamelCase with ISO timestamps:
+    # restore the API key names (InstanceId, DBInstanceIdentifier, ...) and datetimes.
+    # Config also writes absent fields as null, where the API omits the key: drop them
+    # so collectors' `.get(key, default)` / `key in item` checks behave the same.
+    if isinstance(value, dict):
+        return {k[:1].upper() + k[1:]: to_api_shape(v, k) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [to_api_shape(v, key) for v in value]
+    if isinstance(value, str) and key.endswith(('Time', 'Date')) and TIMESTAMP_PATTERN.match(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
+
+def security_group_shape(group):
+    # Config keeps the legacy IpRanges (plain CIDR strings) next to Ipv4Ranges ([{CidrIp}]), which is what EC2 returns
+    for permission in group.get('IpPermissions', []) + group.get('IpPermissionsEgress', []):
+        permission['IpRanges'] = permission.pop('Ipv4Ranges', [])
+    return group
+
+
+SHAPE_FIXES = {
+    "security_groups": security_group_shape,
+}
+
+
+def continuously_recorded_types(recorder):
+    # Resource types a recorder records on every change; daily recording can be up to a day behind
+    all_types = set(CONFIG_RESOURCE_TYPES.values())
+    group = recorder.get('recordingGroup', {})
+    if group.get('allSupported'):
+        types = set(all_types)
+    elif group.get('recordingStrategy', {}).get('useOnly') == 'EXCLUSION_BY_RESOURCE_TYPES':
+        types = all_types - set(group.get('exclusionByResourceTypes', {}).get('resourceTypes', []))
+    else:
+        types = set(group.get('resourceTypes', []))
+
+    mode = recorder.get('recordingMode', {})
+    daily = set(all_types) if mode.get('recordingFrequency') == 'DAILY' else set()
+    for override in mode.get('recordingModeOverrides', []):
+        if override.get('recordingFrequency') == 'DAILY':
+            daily.update(override.get('resourceTypes', []))
+        else:
+            daily.difference_update(override.get('resourceTypes', []))
+    return types - daily
+
+
+def recorded_datasets(config_client):
+    # Datasets the account's recorder keeps current: a stopped or failing recorder leaves Config behind
+    # the live API, so every dataset then falls back to its describe_* call
+    statuses = config_client.describe_configuration_recorder_status().get('ConfigurationRecordersStatus', [])
+    if not any(status.get('recording') and status.get('lastStatus') != 'Failure' for status in statuses):
+        return set()
+    recorded = set()
+    for recorder in config_client.describe_configuration_recorders().get('ConfigurationRecorders', []):
+        types = continuously_recorded_types(recorder)
+        recorded.update(name for name, resource_type in CONFIG_RESOURCE_TYPES.items() if resource_type in types)
+    return recorded
+
+
+def api_shape(name, configuration):
+    shape = to_api_shape(configuration)
+    return SHAPE_FIXES[name](shape) if name in SHAPE_FIXES else shape
+
+
+def parse_result(result):
+    # One select_*_resource_config row → (row, configuration dict)
+    item = json.loads(result)
+    configuration = item.get('configuration')
+    if isinstance(configuration, str):
+        configuration = json.loads(configuration)
+    return item, configuration
+
+
+class AggregatorInventory:
+    """
+    EC2 reference datasets of every source account / region of an AWS Config aggregator.
+
+    The aggregator is queried once, from the aggregator account, and its rows are handed out to
+    each (account, region) context of the run; the result is reused for `max_age` seconds. Sources
+    whose last aggregation did not succeed are left out, as are datasets with no rows for a source
+    (not recorded there, or really empty): those contexts fall back to describe_* calls.
+    """
+
+    def __init__(self, max_age=CONFIG_AGGREGATOR_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._resources = {}
+
+    def resources(self, account_id, region_name):
+        # Only one context queries; the others wait for it and take their share of the rows
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age:
+                self._resources = self._load()
+                self._loaded_at = time.monotonic()
+            return self._resources.get((account_id, region_name), {})
+
+    def _load(self):
+        try:
+            config_client = get_client(get_session(CONFIG_AGGREGATOR_PROFILE, CONFIG_AGGREGATOR_REGION), 'config')
+            sources = fetch_all(config_client, 'describe_configuration_aggregator_sources_status',
+                                'AggregatedSourceStatusList', ConfigurationAggregatorName=CONFIG_AGGREGATOR)
+            current = {(source['SourceId'], source['AwsRegion']) for source in sources
+                       if source.get('LastUpdateStatus') == 'SUCCEEDED'}
+            resource_types = ", ".join(f"'{resource_type}'" for resource_type in sorted(CONFIG_RESOURCE_TYPES.values()))
+            results = fetch_all(
+                config_client, 'select_aggregate_resource_config', 'Results',
+                Expression=f"SELECT accountId, awsRegion, resourceType, configuration WHERE resourceType IN ({resource_types})",
+                ConfigurationAggregatorName=CONFIG_AGGREGATOR
+            )
+        except Exception as e:
+            print(f"[INFO] AWS Config aggregator {CONFIG_AGGREGATOR} unavailable: {e}")
+            return {}
+
+        dataset_by_type = {resource_type: name for name, resource_type in CONFIG_RESOURCE_TYPES.items()}
+        resources = {}
+        for result in results:
+            item, configuration = parse_result(result)
+            source = (item.get('accountId'), item.get('awsRegion'))
+            name = dataset_by_type.get(item.get('resourceType'))
+            if source in current and name and configuration:
+                resources.setdefault(source, {}).setdefault(name, []).append(api_shape(name, configuration))
+
+        print(f"[INFO] AWS Config aggregator {CONFIG_AGGREGATOR}: {len(results)} items for {len(resources)} "
+              f"account/region sources ({len(sources) - len(current)} sources not up to date)")
+        return resources
+
+
+AGGREGATOR_INVENTORY = AggregatorInventory()
+
+
+def select_config_resources(context):
+    """
+    Load the EC2 reference datasets of one (account, region) from AWS Config in one paginated query.
+
+    Returns {dataset name: [items in describe_* shape]} for the resource types Config records.
+    An empty dict (fast path off, Config not recording, query failed) makes every dataset
+    fall back to its describe_* call.
+    """
+    if not CONFIG_FAST_PATH:
+        return {}
+    if CONFIG_AGGREGATOR:
+        return AGGREGATOR_INVENTORY.resources(context.account_id, context.region_name)
+
+    try:
+        config_client = context.client('config')
+        datasets = recorded_datasets(config_client)
+        if not datasets:
+            return {}
+        resource_types = ", ".join(f"'{CONFIG_RESOURCE_TYPES[name]}'" for name in sorted(datasets))
+        results = fetch_all(config_client, 'select_resource_config', 'Results',
+                            Expression=f"SELECT resourceType, configuration WHERE resourceType IN ({resource_types})")
+    except Exception as e:
+        print(f"[INFO] AWS Config fast path unavailable for {context.profile_name}/{context.region_name}: {e}")
+        return {}
+
+    dataset_by_type = {CONFIG_RESOURCE_TYPES[name]: name for name in datasets}
+    resources = {name: [] for name in datasets}
+    for result in results:
+        item, configuration = parse_result(result)
+        name = dataset_by_type.get(item.get('resourceType'))
+        if name and configuration:
+            resources[name].append(api_shape(name, configuration))
+
+    print(f"[INFO] {context.profile_name}/{context.region_name} datasets from AWS Config: "
+          + ", ".join(f"{name} ({len(items)})" for name, items in sorted(resources.items())))
+    return resources
@@ -0,0 +1,238 @@
+import threading
+from modules.client_pool import get_client
+from modules.common import exponential_backoff, chunked
+from modules.paginate import paginate, fetch_all
+from modules.config_inventory import select_config_resources
+
+
+def get_name_tag(tags, default='-'):
+    return next((tag['Value'] for tag in tags or [] if tag['Key'] == 'Name'), default)
+
+
+# InstanceIds per describe_instances call / values per EC2 filter
+INSTANCE_BATCH_SIZE = 1000
+FILTER_VALUES_LIMIT = 200
+
+
+def describe_instances_by_id(ec2_client, instance_ids):
+    # Instance ID → instance, batched; used for instances missing from the shared index
+    instances = {}
+
+    def collect(**kwargs):
+        for reservation in paginate(ec2_client, 'describe_instances', 'Reservations', **kwargs):
+            for inst in reservation.get('Instances', []):
+                instances[inst['InstanceId']] = inst
+
+    for batch in chunked(sorted(instance_ids), INSTANCE_BATCH_SIZE):
+        try:
+            exponential_backoff(collect, InstanceIds=batch)
+        except Exception as e:
+            # An unknown ID fails the whole batch; the instance-id filter skips unknown IDs instead
+            print(f"Error retrieving instance info for batch of {len(batch)}: {e}")
+            for sub_batch in chunked(batch, FILTER_VALUES_LIMIT):
+                try:
+                    exponential_backoff(collect, Filters=[{'Name': 'instance-id', 'Values': sub_batch}])
+                except Exception as e:
+                    print(f"Error retrieving instance info for batch of {len(sub_batch)}: {e}")
+    return instances
+
+
+class CollectionContext:
+    """
+    Shared reference data for one (profile, region) collection run.
+
+    Every collector used to describe subnets, instances, ENIs and security groups
+    on its own. The context fetches each dataset at most once (fully paginated),
+    lazily on first use, and exposes indexed lookups to every collector in the run.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.profile_name = getattr(session, 'profile_name', None) or '-'
+        self.region_name = session.region_name
+        self._lock = threading.Lock()
+        self._dataset_locks = {}
+        self._datasets = {}
+
+    def client(self, service_name, region_name=None):
+        # Clients come from the process-wide pool and are reused across runs
+        return get_client(self.session, service_name, region_name)
+
+    def _load(self, name, loader):
+        if name in self._datasets:
+            return self._datasets[name]
+
+        with self._lock:
+            dataset_lock = self._dataset_locks.setdefault(name, threading.Lock())
+
+        # Only one thread loads a dataset; the others wait and reuse its result
+        with dataset_lock:
+            if name not in self._datasets:
+                self._datasets[name] = loader()
+        return self._datasets[name]
+
+    def _paginate(self, service_name, operation, result_key, **kwargs):
+        return fetch_all(self.client(service_name), operation, result_key, **kwargs)
+
+    # AWS Config fast path: dataset name → items, only for the types Config records ({} when unavailable)
+    @property
+    def config_resources(self):
+        return self._load('config_resources', lambda: select_config_resources(self))
+
+    def _describe(self, name, service_name, operation, result_key, **kwargs):
+        # Config에 기록된 데이터셋은 Config 결과 사용, 아니면 describe_* 호출
+        items = self.config_resources.get(name)
+        if items is not None:
+            return items
+        return self._paginate(service_name, operation, result_key, **kwargs)
+
+    # Caller identity
+    @property
+    def account_id(self):
+        return self._load(
+            'account_id',
+            lambda: self.client('sts').get_caller_identity().get('Account', '-')
+        )
+
+    # Subnets
+    @property
+    def subnets(self):
+        return self._load('subnets', lambda: self._describe('subnets', 'ec2', 'describe_subnets', 'Subnets'))
+
+    @property
+    def subnet_by_id(self):
+        return self._load('subnet_by_id', lambda: {s['SubnetId']: s for s in self.subnets})
+
+    @property
+    def subnet_name_map(self):
+        return self._load(
+            'subnet_name_map',
+            lambda: {sid: get_name_tag(s.get('Tags', [])) for sid, s in self.subnet_by_id.items()}
+        )
+
+    def subnet_name(self, subnet_id, default='-'):
+        return self.subnet_name_map.get(subnet_id, default)
+
+    # Route tables and network ACLs
+    @property
+    def route_tables(self):
+        return self._load('route_tables', lambda: self._describe('route_tables', 'ec2', 'describe_route_tables', 'RouteTables'))
+
+    @property
+    def network_acls(self):
+        return self._load('network_acls', lambda: self._describe('network_acls', 'ec2', 'describe_network_acls', 'NetworkAcls'))
+
+    # EC2 instances
+    @property
+    def instances(self):
+        def load():
+            if self.config_resources.get('instances') is not None:
+                return self.config_resources['instances']
+            reservations = self._paginate('ec2', 'describe_instances', 'Reservations')
+            return [inst for res in reservations for inst in res.get('Instances', [])]
+        return self._load('instances', load)
+
+    @property
+    def instance_by_id(self):
+        return self._load('instance_by_id', lambda: {i['InstanceId']: i for i in self.instances})
+
+    def instance(self, instance_id):
+        return self.instance_by_id.get(instance_id)
+
+    def find_instances(self, instance_ids):
+        # Instance ID → instance for the given IDs; IDs missing from the index (launched after it
+        # was loaded, or not yet in Config) are described directly
+        found = {iid: self.instance_by_id[iid] for iid in instance_ids if iid in self.instance_by_id}
+        missing_ids = set(instance_ids) - found.keys()
+        if missing_ids:
+            found.update(describe_instances_by_id(self.client('ec2'), missing_ids))
+        return found
+
+    # Network interfaces
+    @property
+    def network_interfaces(self):
+        return self._load(
+            'network_interfaces',
+            lambda: self._describe('network_interfaces', 'ec2', 'describe_network_interfaces', 'NetworkInterfaces')
+        )
+
+    @property
+    def used_security_group_ids(self):
+        return self._load(
+            'used_security_group_ids',
+            lambda: {g['GroupId'] for eni in self.network_interfaces for g in eni.get('Groups', [])}
+        )
+
+    # Security groups
+    @property
+    def security_groups(self):
+        return self._load(
+            'security_groups',
+            lambda: self._describe('security_groups', 'ec2', 'describe_security_groups', 'SecurityGroups')
+        )
+
+    @property
+    def security_group_by_id(self):
+        return self._load('security_group_by_id', lambda: {sg['GroupId']: sg for sg in self.security_groups})
+
+    def security_group(self, group_id):
+        return self.security_group_by_id.get(group_id)
+
+    # EBS volumes
+    @property
+    def volumes(self):
+        return self._load('volumes', lambda: self._describe('volumes', 'ec2', 'describe_volumes', 'Volumes'))
+
+    @property
+    def volume_by_id(self):
+        return self._load('volume_by_id', lambda: {v['VolumeId']: v for v in self.volumes})
+
+    def volume(self, volume_id):
+        return self.volume_by_id.get(volume_id)
+
+    # Load balancer target groups
+    @property
+    def target_groups(self):
+        return self._load(
+            'target_groups',
+            lambda: self._paginate('elbv2', 'describe_target_groups', 'TargetGroups')
+        )
+
+    @property
+    def target_group_by_arn(self):
+        return self._load('target_group_by_arn', lambda: {tg['TargetGroupArn']: tg for tg in self.target_groups})
+
+    def target_group(self, target_group_arn):
+        return self.target_group_by_arn.get(target_group_arn)
+
+    # Resource tags (Resource Groups Tagging API): ARN → [{'Key', 'Value'}]
+    @property
+    def resource_tags(self):
+        return self.resource_tags_in(self.region_name)
+
+    def resource_tags_in(self, region_name, resource_type=None):
+        # resource_type (e.g. 's3') limits the sweep to one service, for regions the collector only visits for that service
+        def load():
+            # 리전당 한 번의 get_resources 조회로 태그 인덱스 생성 (실패 시 빈 인덱스 → 리소스별 조회로 대체)
+            filters = {'ResourceTypeFilters': [resource_type]} if resource_type else {}
+            try:
+                mappings = fetch_all(
+                    self.client('resourcegroupstaggingapi', region_name=region_name),
+                    'get_resources', 'ResourceTagMappingList', ResourcesPerPage=100, **filters
+                )
+            except Exception as e:
+                print(f"Error retrieving resource tags in {region_name}: {e}")
+                return {}
+            return {mapping['ResourceARN']: mapping.get('Tags', []) for mapping in mappings}
+
+        if resource_type and f'resource_tags:{region_name}' in self._datasets:
+            # The region's full index is already loaded and covers every type
+            return self._datasets[f'resource_tags:{region_name}']
+        name = f'resource_tags:{region_name}:{resource_type}' if resource_type else f'resource_tags:{region_name}'
+        return self._load(name, load)
+
+    def tags_of(self, arn, region_name=None, resource_type=None):
+        # None when the ARN is not in the index. The Tagging API only lists resources that have (or had)
+        # tags, so an untagged resource and one the index does not cover look the same: callers fall back
+        # to the service's own tag call on None.
+        return self.resource_tags_in(region_name or self.region_name, resource_type).get(arn)
@@ -1,28 +1,20 @@
 from collections import defaultdict
-from modules.common import exponential_backoff
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_db_clusters(session):
+def list_db_clusters(session, context=None):
+    context = context or CollectionContext(session)
     rds_data = []
     try:
-        rds_client = session.client('rds')
-        ec2_client = session.client('ec2')
-
-        # Subnet ID → Name 매핑
-        subnet_name_map = {}
-        subnets = exponential_backoff(ec2_client.describe_subnets)
-        for subnet in subnets['Subnets']:
-            subnet_id = subnet['SubnetId']
-            name_tag = next(
-                (tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'),
-                '-'
-            )
-            subnet_name_map[subnet_id] = name_tag
+        rds_client = context.client('rds')
+
+        # Subnet ID → Name 매핑 (공유 컨텍스트)
+        subnet_name_map = context.subnet_name_map
 
         # Subnet Group ID → [Subnet ID], [Subnet Name] 매핑
         subnet_group_id_to_ids = {}
         subnet_group_id_to_names = {}
-        subnet_groups = exponential_backoff(rds_client.describe_db_subnet_groups)
-        for group in subnet_groups.get('DBSubnetGroups', []):
+        for group in fetch_all(rds_client, 'describe_db_subnet_groups', 'DBSubnetGroups'):
             group_name = group['DBSubnetGroupName']
             subnet_ids = [subnet['SubnetIdentifier'] for subnet in group.get('Subnets', [])]
             subnet_names = [subnet_name_map.get(sid, '-') for sid in subnet_ids]
@@ -32,8 +24,7 @@ def list_db_clusters(session):
         # 클러스터별 DB Type 집계 (인스턴스 타입)
         cluster_to_db_types = defaultdict(set)     # cluster_id -> {db.r6g.large, ...}
 
-        instances = exponential_backoff(rds_client.describe_db_instances)
-        for inst in instances.get('DBInstances', []):
+        for inst in fetch_all(rds_client, 'describe_db_instances', 'DBInstances'):
             cluster_id = inst.get('DBClusterIdentifier')  # 단일 인스턴스(RDS)면 None
             if not cluster_id:
                 continue  # 여기서는 Cluster 인벤토리만 보므로 단일 인스턴스는 스킵
@@ -42,7 +33,7 @@ def list_db_clusters(session):
             cluster_to_db_types[cluster_id].add(db_class)
 
         # 클러스터 조회
-        clusters = exponential_backoff(rds_client.describe_db_clusters)['DBClusters']
+        clusters = fetch_all(rds_client, 'describe_db_clusters', 'DBClusters')
 
         for cluster in clusters:
             cluster_name = cluster.get('DBClusterIdentifier', 'N/A')
@@ -96,5 +87,6 @@ def list_db_clusters(session):
 
     except Exception as e:
         print(f"Error retrieving RDS clusters: {e}")
+        raise
 
     return rds_data
@@ -1,28 +1,31 @@
-from modules.common import exponential_backoff
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_dynamodb_tables(session):
-    client = session.client('dynamodb')
+def list_dynamodb_tables(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('dynamodb')
 
     # Pagination 처리 추가
-    paginator = client.get_paginator('list_tables')
-    pages = paginator.paginate()
+    table_names = fetch_all(client, 'list_tables', "TableNames")
+
+    # describe_table 병렬 조회 (테이블별 실패는 해당 행만 '-' 처리)
+    details = fan_out('dynamodb', lambda table_name: client.describe_table(TableName=table_name), table_names)
 
     result = []
 
-    for page in pages:
-        tables = page.get("TableNames", [])
-        for table_name in tables:
-            table_info = exponential_backoff(client.describe_table, TableName=table_name).get("Table", {})
+    for table_name, response, _ in details:
+        table_info = (response or {}).get("Table", {})
 
-            result.append({
-                "Table Name": table_name,
-                "Status": table_info.get("TableStatus", "-"),
-                "Item Count": table_info.get("ItemCount", "-"),
-                "Size (Bytes)": table_info.get("TableSizeBytes", "-"),
-                "Read Capacity Units": table_info.get("ProvisionedThroughput", {}).get("ReadCapacityUnits", "-"),
-                "Write Capacity Units": table_info.get("ProvisionedThroughput", {}).get("WriteCapacityUnits", "-"),
-                "Creation Date": table_info.get("CreationDateTime", "-"),
-                "ARN": table_info.get("TableArn", "-")
-            })
+        result.append({
+            "Table Name": table_name,
+            "Status": table_info.get("TableStatus", "-"),
+            "Item Count": table_info.get("ItemCount", "-"),
+            "Size (Bytes)": table_info.get("TableSizeBytes", "-"),
+            "Read Capacity Units": table_info.get("ProvisionedThroughput", {}).get("ReadCapacityUnits", "-"),
+            "Write Capacity Units": table_info.get("ProvisionedThroughput", {}).get("WriteCapacityUnits", "-"),
+            "Creation Date": table_info.get("CreationDateTime", "-"),
+            "ARN": table_info.get("TableArn", "-")
+        })
 
     return result
@@ -1,10 +1,10 @@
-from modules.common import exponential_backoff
+from modules.context import CollectionContext
 
-def list_ebs_volumes(session):
+def list_ebs_volumes(session, context=None):
+    context = context or CollectionContext(session)
     ebs_data = []
     try:
-        ec2_client = session.client('ec2')
-        volumes = exponential_backoff(ec2_client.describe_volumes)['Volumes']
+        volumes = context.volumes
 
         for volume in volumes:
             volume_id = volume.get('VolumeId', 'N/A')
@@ -37,4 +37,5 @@ def list_ebs_volumes(session):
             })
     except Exception as e:
         print(f"Error retrieving EBS volumes: {e}")
+        raise
     return ebs_data
@@ -1,115 +1,135 @@
-from modules.common import exponential_backoff
+from modules.common import exponential_backoff, chunked
+from modules.paginate import paginate
+from modules.context import CollectionContext
 
-def list_ec2_instances(session):
-    ec2_data = []
+# ImageIds per describe_images call
+IMAGE_BATCH_SIZE = 100
 
-    try:
-        region = session.region_name or session.client('ec2').meta.region_name
-        sts_client = session.client('sts')
-        account_id = sts_client.get_caller_identity().get('Account', '-')
-        profile_name = session.profile_name if hasattr(session, 'profile_name') else '-'
-
-        ec2_client = session.client('ec2')
-        ssm_client = session.client('ssm')
-
-        # Subnet ID → Name 매핑
-        subnet_name_map = {}
-        subnets = exponential_backoff(ec2_client.describe_subnets)
-        for subnet in subnets['Subnets']:
-            subnet_id = subnet['SubnetId']
-            name_tag = next((tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'), '-')
-            subnet_name_map[subnet_id] = name_tag
-
-        instances = ec2_client.describe_instances()
-
-        for reservation in instances.get('Reservations', []):
-            for instance in reservation.get('Instances', []):
-                # SSM 관리 여부 확인
-                def ssm_check():
-                    return ssm_client.describe_instance_information(Filters=[
-                        {'Key': 'InstanceIds', 'Values': [instance['InstanceId']]}
-                    ])
-                try:
-                    ssm_response = exponential_backoff(ssm_check)
-                    ssm_managed = len(ssm_response.get('InstanceInformationList', [])) > 0
-                except Exception as e:
-                    print(f"Error checking SSM for {instance['InstanceId']}: {e}")
-                    ssm_managed = False
-
-                # EBS 볼륨 정보
-                volumes_info = []
-                for device in instance.get('BlockDeviceMappings', []):
-                    if 'Ebs' in device:
-                        def volume_info():
-                            return ec2_client.describe_volumes(VolumeIds=[device['Ebs']['VolumeId']])
-                        try:
-                            volume = exponential_backoff(volume_info)
-                            volumes_info.append({
-                                "VolumeId": device['Ebs']['VolumeId'],
-                                "Size (GB)": volume['Volumes'][0]['Size']
-                            })
-                        except Exception as e:
-                            print(f"Error retrieving volume info for {device['Ebs']['VolumeId']}: {e}")
-
-                volumes = ', '.join([vol['VolumeId'] for vol in volumes_info])
-                volume_sizes = ', '.join([f"{vol['Size (GB)']} GB" for vol in volumes_info])
-
-                # 태그 파싱
-                tags = instance.get('Tags', [])
-                tags_parsed = ', '.join([f"{tag['Key']}: {tag['Value']}" for tag in tags])
-                instance_name = next((tag['Value'] for tag in tags if tag['Key'] == 'Name'), '-')
-
-                # 서브넷 이름
-                subnet_id = instance.get('SubnetId', '-')
-                subnet_name = subnet_name_map.get(subnet_id, '-')
-
-                # 보안 그룹, 키페어, IAM 역할
-                security_groups = instance.get('SecurityGroups', [])
-                security_groups_parsed = ', '.join([g['GroupName'] for g in security_groups])
-                key_name = instance.get('KeyName', '-')
-                iam_instance_profile = instance.get('IamInstanceProfile', {})
-                iam_role_name = '-'
-                if 'Arn' in iam_instance_profile:
-                    iam_role_name = iam_instance_profile['Arn'].split('/')[-1]
-
-                # AMI ID 및 AMI Name 조회
-                image_id = instance.get('ImageId', '-')
+def list_ssm_managed_instances(ssm_client):
+    # 인스턴스마다 조회하지 않고 한 번의 페이지네이션 조회로 SSM 관리 대상 수집
+    managed = set()
+    for info in paginate(ssm_client, 'describe_instance_information', 'InstanceInformationList',
+                         PaginationConfig={'PageSize': 50}):
+        managed.add(info['InstanceId'])
+    return managed
+
+def describe_image_names(ec2_client, image_ids):
+    # 중복 제거한 AMI ID를 묶어서 조회 (AMI ID → Name)
+    names = {}
+    for batch in chunked(sorted(image_ids), IMAGE_BATCH_SIZE):
+        try:
+            images = exponential_backoff(ec2_client.describe_images, ImageIds=batch).get('Images', [])
+        except Exception as e:
+            # One malformed / unknown ID fails the whole batch; resolve that batch one by one
+            print(f"Error retrieving AMI info for batch of {len(batch)}: {e}")
+            images = []
+            for image_id in batch:
                 try:
-                    def ami_info():
-                        return ec2_client.describe_images(ImageIds=[image_id])
-                    images = exponential_backoff(ami_info).get('Images', [])
-                    ami_name = images[0].get('Name', '-') if images else '-'
+                    images.extend(exponential_backoff(ec2_client.describe_images, ImageIds=[image_id]).get('Images', []))
                 except Exception as e:
                     print(f"Error retrieving AMI info for {image_id}: {e}")
-                    ami_name = '-'
-
-                ec2_data.append({
-                    'Account ID': account_id,
-                    'Profile Name': profile_name,
-                    'Region': region,
-                    'Instance Name': instance_name,
-                    'Instance ID': instance['InstanceId'],
-                    'Instance Type': instance['InstanceType'],
-                    'State': instance['State']['Name'],
-                    'SSM Managed': 'Yes' if ssm_managed else 'No',
-                    'VPC ID': instance.get('VpcId', '-'),
-                    'Subnet ID': subnet_id,
-                    'Subnet Name': subnet_name,
-                    'Availability Zone': instance['Placement']['AvailabilityZone'],
-                    'Key Name': key_name,
-                    'IAM Role': iam_role_name,
-                    'Private IP Address': instance.get('PrivateIpAddress', '-'),
-                    'Public IP Address': instance.get('PublicIpAddress', '-'),
-                    'Launch Time': instance['LaunchTime'].strftime("%Y-%m-%d %H:%M:%S"),
-                    'AMI ID': image_id,
-                    'AMI Name': ami_name,
-                    'Volumes': volumes,
-                    'Volume Sizes': volume_sizes,
-                    'Security Groups': security_groups_parsed,
-                    'Tags': tags_parsed
-                })
+        for image in images:
+            names[image['ImageId']] = image.get('Name', '-')
+    return names
+
+def list_ec2_instances(session, context=None):
+    context = context or CollectionContext(session)
+    ec2_data = []
+
+    try:
+        region = context.region_name or context.client('ec2').meta.region_name
+        account_id = context.account_id
+        profile_name = context.profile_name
+
+        ec2_client = context.client('ec2')
+        ssm_client = context.client('ssm')
+
+        # Subnet ID → Name 매핑 (공유 컨텍스트)
+        subnet_name_map = context.subnet_name_map
+
+        instances = context.instances
+
+        # SSM 관리 대상 (한 번에 조회)
+        try:
+            ssm_managed_ids = exponential_backoff(list_ssm_managed_instances, ssm_client)
+        except Exception as e:
+            print(f"Error checking SSM managed instances: {e}")
+            ssm_managed_ids = set()
+
+        # AMI ID → Name (중복 제거 후 일괄 조회)
+        image_names = describe_image_names(
+            ec2_client, {inst['ImageId'] for inst in instances if inst.get('ImageId')}
+        )
+
+        for instance in instances:
+            ssm_managed = instance['InstanceId'] in ssm_managed_ids
+
+            # EBS 볼륨 정보 (공유 컨텍스트의 볼륨 목록에서 조회)
+            volumes_info = []
+            for device in instance.get('BlockDeviceMappings', []):
+                if 'Ebs' in device:
+                    volume = context.volume(device['Ebs']['VolumeId'])
+                    if volume is None:
+                        print(f"Error retrieving volume info for {device['Ebs']['VolumeId']}: not found")
+                        continue
+                    volumes_info.append({
+                        "VolumeId": device['Ebs']['VolumeId'],
+                        "Size (GB)": volume['Size']
+                    })
+
+            volumes = ', '.join([vol['VolumeId'] for vol in volumes_info])
+            volume_sizes = ', '.join([f"{vol['Size (GB)']} GB" for vol in volumes_info])
+
+            # 태그 파싱
+            tags = instance.get('Tags', [])
+            tags_parsed = ', '.join([f"{tag['Key']}: {tag['Value']}" for tag in tags])
+            instance_name = next((tag['Value'] for tag in tags if tag['Key'] == 'Name'), '-')
+
+            # 서브넷 이름
+            subnet_id = instance.get('SubnetId', '-')
+            subnet_name = subnet_name_map.get(subnet_id, '-')
+
+            # 보안 그룹, 키페어, IAM 역할
+            security_groups = instance.get('SecurityGroups', [])
+            security_groups_parsed = ', '.join([g['GroupName'] for g in security_groups])
+            key_name = instance.get('KeyName', '-')
+            iam_instance_profile = instance.get('IamInstanceProfile', {})
+            iam_role_name = '-'
+            if 'Arn' in iam_instance_profile:
+                iam_role_name = iam_instance_profile['Arn'].split('/')[-1]
+
+            # AMI ID 및 AMI Name 조회
+            image_id = instance.get('ImageId', '-')
+            ami_name = image_names.get(image_id, '-')
+
+            ec2_data.append({
+                'Account ID': account_id,
+                'Profile Name': profile_name,
+                'Region': region,
+                'Instance Name': instance_name,
+                'Instance ID': instance['InstanceId'],
+                'Instance Type': instance['InstanceType'],
+                'State': instance['State']['Name'],
+                'SSM Managed': 'Yes' if ssm_managed else 'No',
+                'VPC ID': instance.get('VpcId', '-'),
+                'Subnet ID': subnet_id,
+                'Subnet Name': subnet_name,
+                'Availability Zone': instance['Placement']['AvailabilityZone'],
+                'Key Name': key_name,
+                'IAM Role': iam_role_name,
+                'Private IP Address': instance.get('PrivateIpAddress', '-'),
+                'Public IP Address': instance.get('PublicIpAddress', '-'),
+                'Launch Time': instance['LaunchTime'].strftime("%Y-%m-%d %H:%M:%S"),
+                'AMI ID': image_id,
+                'AMI Name': ami_name,
+                'Volumes': volumes,
+                'Volume Sizes': volume_sizes,
+                'Security Groups': security_groups_parsed,
+                'Tags': tags_parsed
+            })
 
     except Exception as e:
         print(f"Error retrieving EC2 instances: {e}")
+        raise
 
     return ec2_data
@@ -1,27 +1,22 @@
-from modules.common import exponential_backoff
-
-def list_eks_clusters(session):
-    eks_client = session.client('eks')
-    ec2_client = session.client('ec2')
-
-    # Subnet ID → Name 매핑
-    subnet_name_map = {}
-    subnets = exponential_backoff(ec2_client.describe_subnets)
-    for subnet in subnets['Subnets']:
-        subnet_id = subnet['SubnetId']
-        name_tag = next(
-            (tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'),
-            '-'
-        )
-        subnet_name_map[subnet_id] = name_tag
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
+
+def list_eks_clusters(session, context=None):
+    context = context or CollectionContext(session)
+    eks_client = context.client('eks')
+
+    # Subnet ID → Name 매핑 (공유 컨텍스트)
+    subnet_name_map = context.subnet_name_map
+
+    cluster_names = fetch_all(eks_client, 'list_clusters', "clusters")
+    # describe_cluster 병렬 조회 (클러스터별 실패는 해당 행만 '-' 처리)
+    details = fan_out('eks', lambda cluster_name: eks_client.describe_cluster(name=cluster_name), cluster_names)
 
-    cluster_names = exponential_backoff(eks_client.list_clusters).get("clusters", [])
     result = []
 
-    for cluster_name in cluster_names:
-        cluster_info = exponential_backoff(
-            eks_client.describe_cluster, name=cluster_name
-        ).get("cluster", {})
+    for cluster_name, response, _ in details:
+        cluster_info = (response or {}).get("cluster", {})
 
         created_at = cluster_info.get("createdAt")
         created_at_str = (
@@ -1,24 +1,20 @@
 from modules.common import exponential_backoff
+from modules.paginate import paginate, fetch_all
+from modules.context import CollectionContext
 
-def list_elasticache_clusters(session):
+def list_elasticache_clusters(session, context=None):
+    context = context or CollectionContext(session)
     elasticache_data = []
     try:
-        elasticache_client = session.client('elasticache')
-        ec2_client = session.client('ec2')
+        elasticache_client = context.client('elasticache')
 
-        # Subnet ID → Name 매핑
-        subnet_name_map = {}
-        subnets = exponential_backoff(ec2_client.describe_subnets)
-        for subnet in subnets['Subnets']:
-            subnet_id = subnet['SubnetId']
-            name_tag = next((tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'), '-')
-            subnet_name_map[subnet_id] = name_tag
+        # Subnet ID → Name 매핑 (공유 컨텍스트)
+        subnet_name_map = context.subnet_name_map
 
         # Subnet Group → Subnet IDs / Subnet Names 매핑
         subnet_id_map = {}
         subnet_name_list_map = {}
-        subnet_groups_resp = exponential_backoff(elasticache_client.describe_cache_subnet_groups)
-        for group in subnet_groups_resp.get('CacheSubnetGroups', []):
+        for group in fetch_all(elasticache_client, 'describe_cache_subnet_groups', 'CacheSubnetGroups'):
             group_name = group['CacheSubnetGroupName']
             subnet_ids = [sn['SubnetIdentifier'] for sn in group.get('Subnets', [])]
             subnet_names = [subnet_name_map.get(sn_id, '-') for sn_id in subnet_ids]
@@ -26,15 +22,12 @@ def list_elasticache_clusters(session):
             subnet_name_list_map[group_name] = subnet_names
 
         # 클러스터 조회
-        paginator = elasticache_client.get_paginator('describe_cache_clusters')
-        response_iterator = paginator.paginate(ShowCacheNodeInfo=True)
-
-        for response in response_iterator:
+        for response in paginate(elasticache_client, 'describe_cache_clusters', ShowCacheNodeInfo=True):
             clusters = response.get('CacheClusters', [])
 
             for cluster in clusters:
                 cluster_name = cluster.get('CacheClusterId', '-')
-                region = session.region_name
+                region = context.region_name
                 engine = cluster.get('Engine', '-')
                 subnet_group = cluster.get('CacheSubnetGroupName', '-')
                 subnet_ids = subnet_id_map.get(subnet_group, ['-'])
@@ -50,15 +43,17 @@ def list_elasticache_clusters(session):
                 encryption_at_rest = cluster.get('AtRestEncryptionEnabled', '-') if engine == 'redis' else '-'
                 auto_failover = cluster.get('AutoMinorVersionUpgrade', '-') if engine == 'redis' else '-'
 
-                # 태그 조회
+                # 태그 조회 (태그 인덱스에 없는 클러스터만 개별 조회)
                 arn = cluster.get('ARN', None)
                 if arn:
                     try:
-                        tags_response = exponential_backoff(
-                            elasticache_client.list_tags_for_resource,
-                            ResourceName=arn
-                        )
-                        tags = ', '.join([f"{tag['Key']}={tag['Value']}" for tag in tags_response.get('TagList', [])])
+                        tag_list = context.tags_of(arn)
+                        if tag_list is None:
+                            tag_list = exponential_backoff(
+                                elasticache_client.list_tags_for_resource,
+                                ResourceName=arn
+                            ).get('TagList', [])
+                        tags = ', '.join([f"{tag['Key']}={tag['Value']}" for tag in tag_list])
                     except Exception:
                         tags = '-'
                 else:
@@ -85,5 +80,6 @@ def list_elasticache_clusters(session):
 
     except Exception as e:
         print(f"Error retrieving ElastiCache clusters: {e}")
+        raise
 
     return elasticache_data
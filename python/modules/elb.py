@@ -1,82 +1,125 @@
-from modules.common import exponential_backoff
+from modules.common import exponential_backoff, chunked
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_elbs(session):
+# describe_tags accepts at most 20 ARNs per call
+TAG_BATCH_SIZE = 20
+
+def describe_tags(elb_client, arns):
+    # ARN → tags, 20개씩 묶어서 조회
+    tags = {}
+    for batch in chunked(arns, TAG_BATCH_SIZE):
+        try:
+            response = exponential_backoff(elb_client.describe_tags, ResourceArns=batch)
+            for desc in response['TagDescriptions']:
+                tags[desc['ResourceArn']] = desc.get('Tags', [])
+        except Exception as e:
+            print(f"Error retrieving tags for {len(batch)} ELBs: {e}")
+    return tags
+
+def describe_attributes(elb_client, requests):
+    # requests: [(operation, parameter name, ARN)] → {ARN: ({key: value}, error)}, bounded parallel
+    def describe(request):
+        operation, parameter, arn = request
+        return getattr(elb_client, operation)(**{parameter: arn})['Attributes']
+
+    return {
+        arn: ({attr['Key']: attr['Value'] for attr in attributes or []}, error)
+        for (_, _, arn), attributes, error in fan_out('elbv2', describe, requests, label=lambda request: request[2])
+    }
+
+def format_stickiness(target_groups, tg_attributes):
+    # LB에 연결된 TG 중 stickiness가 켜진 TG와 타입 표시
+    if not target_groups:
+        return '-'
+    sticky = []
+    for tg in target_groups:
+        attributes, _ = tg_attributes.get(tg['TargetGroupArn'], ({}, None))
+        if attributes.get('stickiness.enabled') == 'true':
+            sticky.append(f"{tg['TargetGroupName']}: {attributes.get('stickiness.type', '-')}")
+    return ', '.join(sticky) if sticky else 'Disabled'
+
+def list_elbs(session, context=None):
+    context = context or CollectionContext(session)
     elb_data = []
     try:
-        elb_client = session.client('elbv2')
-        ec2_client = session.client('ec2')
-
-        # Subnet ID → Name 매핑
-        subnet_name_map = {}
-        subnets = exponential_backoff(ec2_client.describe_subnets)
-        for subnet in subnets['Subnets']:
-            subnet_id = subnet['SubnetId']
-            name_tag = next((tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'), '-')
-            subnet_name_map[subnet_id] = name_tag
-
-        paginator = elb_client.get_paginator('describe_load_balancers')
-        response_iterator = paginator.paginate()
-
-        for response in response_iterator:
-            for elb in response['LoadBalancers']:
-                name = elb['LoadBalancerName']
-                dns_name = elb['DNSName']
-                state_code = elb['State']['Code']
-                scheme = elb['Scheme']
-                lb_type = elb['Type']
-                availability_zones = ', '.join([az['ZoneName'] for az in elb['AvailabilityZones']])
-
-                subnet_ids = []
-                subnet_names = []
-                for az in elb['AvailabilityZones']:
-                    subnet_id = az.get('SubnetId', '-')
-                    subnet_name = subnet_name_map.get(subnet_id, '-')
-                    subnet_ids.append(subnet_id)
-                    subnet_names.append(subnet_name)
-
-                security_groups = elb.get('SecurityGroups', [])
-                security_groups_str = ', '.join(security_groups)
-
-                cross_zone, stickiness, access_logs = '-', '-', '-'
-                try:
-                    attributes = exponential_backoff(
-                        elb_client.describe_load_balancer_attributes,
-                        LoadBalancerArn=elb['LoadBalancerArn']
-                    )
-                    for attr in attributes['Attributes']:
-                        if attr['Key'] == 'load_balancing.cross_zone.enabled':
-                            cross_zone = attr['Value']
-                        elif attr['Key'] == 'access_logs.s3.enabled':
-                            access_logs = attr['Value']
-                except Exception as e:
-                    print(f"Error retrieving attributes for ELB {name}: {e}")
-
-                try:
-                    tags_response = exponential_backoff(
-                        elb_client.describe_tags,
-                        ResourceArns=[elb['LoadBalancerArn']]
-                    )
-                    tags = {tag['Key']: tag['Value'] for tag in tags_response['TagDescriptions'][0]['Tags']}
-                    tags_str = ', '.join([f"{k}: {v}" for k, v in tags.items()])
-                except Exception as e:
-                    print(f"Error retrieving tags for ELB {name}: {e}")
-                    tags_str = '-'
-
-                elb_data.append({
-                    'Name': name,
-                    'DNS Name': dns_name,
-                    'State Code': state_code,
-                    'Scheme': scheme,
-                    'Type': lb_type,
-                    'AZ': availability_zones,
-                    'Subnet ID': ', '.join(subnet_ids),
-                    'Subnet Name': ', '.join(subnet_names),
-                    'ELB Security Group ID': security_groups_str,
-                    'Cross-Zone Load Balancing': cross_zone,
-                    'Stickiness': stickiness,
-                    'Access Logs': access_logs,
-                    'Tag': tags_str
-                })
+        elb_client = context.client('elbv2')
+
+        # Subnet ID → Name 매핑 (공유 컨텍스트)
+        subnet_name_map = context.subnet_name_map
+
+        elbs = fetch_all(elb_client, 'describe_load_balancers', 'LoadBalancers')
+        elb_arns = [elb['LoadBalancerArn'] for elb in elbs]
+
+        # LB별 Target Group (공유 컨텍스트) → Stickiness 계산용
+        target_groups_by_lb = {}
+        if elbs:
+            for tg in context.target_groups:
+                for lb_arn in tg.get('LoadBalancerArns', []):
+                    target_groups_by_lb.setdefault(lb_arn, []).append(tg)
+        tg_arns = sorted({tg['TargetGroupArn'] for tgs in target_groups_by_lb.values() for tg in tgs})
+
+        # 태그는 리전 태그 인덱스에서, 인덱스에 없는 LB만 20개씩 일괄 조회 / LB · TG 속성은 병렬 조회
+        indexed_tags = {arn: context.tags_of(arn) for arn in elb_arns}
+        tags_by_arn = {arn: tags for arn, tags in indexed_tags.items() if tags is not None}
+        tags_by_arn.update(describe_tags(elb_client, [arn for arn in elb_arns if arn not in tags_by_arn]))
+        attributes = describe_attributes(
+            elb_client,
+            [('describe_load_balancer_attributes', 'LoadBalancerArn', arn) for arn in elb_arns] +
+            [('describe_target_group_attributes', 'TargetGroupArn', arn) for arn in tg_arns]
+        )
+
+        for elb in elbs:
+            name = elb['LoadBalancerName']
+            dns_name = elb['DNSName']
+            state_code = elb['State']['Code']
+            scheme = elb.get('Scheme', '-')
+            lb_type = elb['Type']
+            availability_zones = ', '.join([az['ZoneName'] for az in elb['AvailabilityZones']])
+
+            subnet_ids = []
+            subnet_names = []
+            for az in elb['AvailabilityZones']:
+                subnet_id = az.get('SubnetId', '-')
+                subnet_name = subnet_name_map.get(subnet_id, '-')
+                subnet_ids.append(subnet_id)
+                subnet_names.append(subnet_name)
+
+            security_groups = elb.get('SecurityGroups', [])
+            security_groups_str = ', '.join(security_groups)
+
+            cross_zone, access_logs = '-', '-'
+            lb_attributes, error = attributes[elb['LoadBalancerArn']]
+            if error is not None:
+                print(f"Error retrieving attributes for ELB {name}: {error}")
+            cross_zone = lb_attributes.get('load_balancing.cross_zone.enabled', cross_zone)
+            access_logs = lb_attributes.get('access_logs.s3.enabled', access_logs)
+
+            stickiness = format_stickiness(target_groups_by_lb.get(elb['LoadBalancerArn'], []), attributes)
+
+            if elb['LoadBalancerArn'] in tags_by_arn:
+                tags = {tag['Key']: tag['Value'] for tag in tags_by_arn[elb['LoadBalancerArn']]}
+                tags_str = ', '.join([f"{k}: {v}" for k, v in tags.items()])
+            else:
+                tags_str = '-'
+
+            elb_data.append({
+                'Name': name,
+                'DNS Name': dns_name,
+                'State Code': state_code,
+                'Scheme': scheme,
+                'Type': lb_type,
+                'AZ': availability_zones,
+                'Subnet ID': ', '.join(subnet_ids),
+                'Subnet Name': ', '.join(subnet_names),
+                'ELB Security Group ID': security_groups_str,
+                'Cross-Zone Load Balancing': cross_zone,
+                'Stickiness': stickiness,
+                'Access Logs': access_logs,
+                'Tag': tags_str
+            })
     except Exception as e:
         print(f"Error retrieving ELBs: {e}")
+        raise
     return elb_data
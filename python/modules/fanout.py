@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+from modules.common import exponential_backoff
+
+# Concurrent detail calls per collector, by service (the shared rate limiter still paces every request)
+FANOUT_LIMITS = {
+    'acm': 4,
+    'eks': 4,
+    'kms': 8,
+    'sqs': 8,
+    'sns': 8,
+    'dynamodb': 8,
+    'elbv2': 8,
+    'opensearch': 4,
+    'ses': 4,
+    's3': 16,
+}
+DEFAULT_FANOUT_LIMIT = 4
+
+
+def fan_out(service, call, items, label=str):
+    """
+    Run `call(item)` for every item on a bounded pool, with throttling backoff.
+
+    Returns [(item, result, error)] in the order of `items`. A failing item is logged
+    and reported with result None instead of aborting the whole collector.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item):
+        try:
+            return item, exponential_backoff(call, item), None
+        except Exception as e:
+            print(f"Error retrieving {service} details for {label(item)}: {e}")
+            return item, None, e
+
+    with ThreadPoolExecutor(max_workers=min(len(items), FANOUT_LIMITS.get(service, DEFAULT_FANOUT_LIMIT))) as executor:
+        return list(executor.map(run, items))
@@ -1,43 +1,89 @@
 from modules.common import exponential_backoff
+from modules.paginate import paginate
+from modules.context import CollectionContext
 
-def list_iam_roles(session):
-    iam_client = session.client('iam')
+AWS_MANAGED_POLICY_PREFIX = 'arn:aws:iam::aws:policy/'
+# Excel cells hold at most 32,767 characters
+MAX_CELL_LENGTH = 32000
+
+def get_account_authorization_details(iam_client):
+    # Role과 고객 관리형 정책을 한 번의 페이지네이션 조회로 수집 (역할별 호출 없음)
+    roles, policies = [], []
+    for page in paginate(iam_client, 'get_account_authorization_details', Filter=['Role', 'LocalManagedPolicy']):
+        roles.extend(page.get('RoleDetailList', []))
+        policies.extend(page.get('Policies', []))
+    return roles, policies
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+def trusted_entities_of(role):
+    trusted_entities = []
+    assume_role_policy_document = role.get('AssumeRolePolicyDocument', {})
+    if isinstance(assume_role_policy_document, dict):
+        for statement in as_list(assume_role_policy_document.get('Statement', [])):
+            if statement.get('Effect') == 'Allow':
+                principal = statement.get('Principal', {})
+                if not isinstance(principal, dict):
+                    trusted_entities.append(principal)
+                    continue
+                for entity_type, entities in principal.items():
+                    trusted_entities.extend(as_list(entities))
+    return trusted_entities
+
+def allowed_actions(document):
+    actions = set()
+    if isinstance(document, dict):
+        for statement in as_list(document.get('Statement', [])):
+            if statement.get('Effect') == 'Allow':
+                actions.update(as_list(statement.get('Action', [])))
+    return actions
+
+def default_policy_documents(policies):
+    # Policy ARN → default version document (customer managed policies only)
+    documents = {}
+    for policy in policies:
+        for version in policy.get('PolicyVersionList', []):
+            if version.get('IsDefaultVersion'):
+                documents[policy['Arn']] = version.get('Document', {})
+    return documents
+
+def list_iam_roles(session, context=None):
+    context = context or CollectionContext(session)
+    iam_client = context.client('iam')
     roles_data = []
     try:
-        # List all IAM roles
-        paginator = iam_client.get_paginator('list_roles')
-        for page in exponential_backoff(paginator.paginate):
-            for role in page['Roles']:
-                role_name = role['RoleName']
-                trusted_entities = []
-                assume_role_policy_document = role.get('AssumeRolePolicyDocument', {})
-                if isinstance(assume_role_policy_document, dict):
-                    for statement in assume_role_policy_document.get('Statement', []):
-                        if statement.get('Effect') == 'Allow':
-                            principal = statement.get('Principal', {})
-                            for entity_type, entities in principal.items():
-                                if isinstance(entities, list):
-                                    trusted_entities.extend(entities)
-                                else:
-                                    trusted_entities.append(entities)
-
-                trusted_entities_str = ', '.join(trusted_entities)
-
-                # Get attached policies
-                policy_arns = []
-                try:
-                    attached_policies = exponential_backoff(iam_client.list_attached_role_policies, RoleName=role_name)
-                    for policy in attached_policies.get('AttachedPolicies', []):
-                        policy_arns.append(policy['PolicyArn'].replace('arn:aws:iam::aws:policy/', ''))
-                except Exception as e:
-                    print(f"Error retrieving attached policies for role {role_name}: {e}")
-
-                # Add role data to list
-                roles_data.append({
-                    'Name': role_name,
-                    'Trusted Entities': trusted_entities_str,
-                    'Policy(arn:aws:iam::)': ', '.join(policy_arns)
-                })
+        roles, policies = exponential_backoff(get_account_authorization_details, iam_client)
+        policy_documents = default_policy_documents(policies)
+
+        for role in roles:
+            role_name = role['RoleName']
+            trusted_entities_str = ', '.join(trusted_entities_of(role))
+
+            # Attached managed policies
+            attached_policies = role.get('AttachedManagedPolicies', [])
+            policy_arns = [policy['PolicyArn'].replace(AWS_MANAGED_POLICY_PREFIX, '') for policy in attached_policies]
+
+            # Inline policies
+            inline_policies = role.get('RolePolicyList', [])
+            inline_policy_names = [policy['PolicyName'] for policy in inline_policies]
+
+            # Actions allowed by inline + customer managed policies (AWS managed policy documents are not collected)
+            actions = set()
+            for policy in inline_policies:
+                actions.update(allowed_actions(policy.get('PolicyDocument', {})))
+            for policy in attached_policies:
+                actions.update(allowed_actions(policy_documents.get(policy['PolicyArn'], {})))
+
+            # Add role data to list
+            roles_data.append({
+                'Name': role_name,
+                'Trusted Entities': trusted_entities_str,
+                'Policy(arn:aws:iam::)': ', '.join(policy_arns),
+                'Inline Policies': ', '.join(inline_policy_names) if inline_policy_names else '-',
+                'Allowed Actions (Inline/Customer Managed)': ', '.join(sorted(actions))[:MAX_CELL_LENGTH] if actions else '-'
+            })
     except Exception as e:
         print(f"Error retrieving IAM roles: {e}")
+        raise
     return roles_data
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+
+class Job:
+    """
+    One asynchronous inventory download. Collection code reports into it through
+    `collector_started` / `collector_finished`, which makes a Job usable as the
+    `progress` argument of the collection functions in app.py.
+    """
+
+    def __init__(self, key, total):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.total = total
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.expires_at = None
+        self.error = None
+        self.artifact_path = None
+        self.download_name = None
+        self.collectors = {}
+        self._lock = threading.Lock()
+
+    def collector_started(self, profile, region, key):
+        with self._lock:
+            self.collectors[(profile, region, key)] = {'status': 'running', 'started': time.time()}
+
+    def collector_finished(self, profile, region, key, seconds, rows=None, cached=False, error=None):
+        with self._lock:
+            entry = self.collectors.setdefault((profile, region, key), {})
+            entry.update({
+                'status': 'failed' if error else 'done',
+                'seconds': round(seconds, 2),
+                'rows': rows,
+                'cached': cached,
+                'error': error
+            })
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def to_dict(self):
+        with self._lock:
+            collectors = [
+                {'profile': profile, 'region': region, 'collector': key,
+                 **{k: v for k, v in entry.items() if k != 'started'}}
+                for (profile, region, key), entry in self.collectors.items()
+            ]
+        done = sum(1 for c in collectors if c['status'] in ('done', 'failed'))
+        elapsed_end = self.finished_at or time.time()
+        return {
+            'id': self.id,
+            'status': self.status,
+            'created_at': _isoformat(self.created_at),
+            'started_at': _isoformat(self.started_at),
+            'finished_at': _isoformat(self.finished_at),
+            'expires_at': _isoformat(self.expires_at),
+            'elapsed_seconds': round(elapsed_end - self.started_at, 2) if self.started_at else 0,
+            'progress': {'done': done, 'total': self.total},
+            'collectors': collectors,
+            'artifact': f"/jobs/{self.id}/artifact" if self.status == 'succeeded' else None,
+            'download_name': self.download_name,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """
+    Runs download jobs on a small worker pool behind a bounded queue.
+
+    A job is identified by what it collects (`key`); submitting a key that already has a
+    queued or running job returns that job instead of starting a duplicate sweep. Finished
+    artifacts stay downloadable for `artifact_ttl` seconds and are then deleted.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, artifact_ttl=3600):
+        self.max_pending = max_pending
+        self.artifact_ttl = artifact_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, total, build):
+        # build(job) runs the collection and returns (artifact_path, download_name)
+        self.purge_expired()
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.active:
+                    return job, False
+            if sum(1 for job in self._jobs.values() if job.active) >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs (max {self.max_pending})")
+            job = Job(key, total)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, build)
+        return job, True
+
+    def _run(self, job, build):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.artifact_path, job.download_name = build(job)
+            job.status = 'succeeded'
+        except Exception as e:
+            print(f"[ERROR] Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            job.expires_at = job.finished_at + self.artifact_ttl
+
+    def get(self, job_id):
+        self.purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expires_at and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            if job.artifact_path and os.path.exists(job.artifact_path):
+                os.remove(job.artifact_path)
@@ -1,14 +1,20 @@
-from modules.common import exponential_backoff
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_kms_keys(session):
-    client = session.client('kms')
-    keys = exponential_backoff(client.list_keys).get("Keys", [])
+def list_kms_keys(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('kms')
+    keys = fetch_all(client, 'list_keys', "Keys")
+
+    # describe_key 병렬 조회 (키별 실패는 해당 행만 '-' 처리)
+    details = fan_out('kms', lambda key: client.describe_key(KeyId=key["KeyId"]), keys, label=lambda key: key.get("KeyId"))
 
     result = []
 
-    for key in keys:
+    for key, response, _ in details:
         key_id = key.get("KeyId", "-")
-        key_info = exponential_backoff(client.describe_key, KeyId=key_id).get("KeyMetadata", {})
+        key_info = (response or {}).get("KeyMetadata", {})
 
         creation_date = key_info.get("CreationDate")
         creation_date_str = creation_date.astimezone().replace(tzinfo=None).isoformat() if creation_date else "-"
@@ -1,12 +1,12 @@
-from modules.common import exponential_backoff
-
-def list_lambda_functions(session):
-    client = session.client('lambda')
-    paginator = client.get_paginator('list_functions')
+from modules.paginate import paginate
+from modules.context import CollectionContext
 
+def list_lambda_functions(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('lambda')
     result = []
 
-    for page in paginator.paginate():
+    for page in paginate(client, 'list_functions'):
         for function in page.get("Functions", []):
             result.append({
                 "Function Name": function.get("FunctionName", "-"),
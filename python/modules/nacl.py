@@ -1,17 +1,16 @@
-from modules.common import exponential_backoff
+from botocore.exceptions import BotoCoreError, ClientError
+from modules.context import CollectionContext
 
-def list_nacls(session):
-    ec2_client = session.client('ec2')
+def list_nacls(session, context=None):
+    context = context or CollectionContext(session)
     nacls = []
 
     try:
-        # Retrieve all NACLs
-        response = exponential_backoff(ec2_client.describe_network_acls)
-        
-        for nacl in response.get('NetworkAcls', []):
+        # Retrieve all NACLs (공유 컨텍스트, 서브넷 수집과 공유)
+        for nacl in context.network_acls:
             nacl_id = nacl.get('NetworkAclId', '-')
             vpc_id = nacl.get('VpcId', '-')
-            region = session.region_name
+            region = context.region_name
             name = '-'
             for tag in nacl.get('Tags', []):
                 if tag.get('Key') == 'Name':
@@ -47,7 +46,8 @@ def list_nacls(session):
                     'Allow / Deny': allow_deny
                 })
     
-    except (BotoCoreError) as e:
+    except (BotoCoreError, ClientError) as e:
         print(f"Error retrieving NACLs: {e}")
+        raise
 
     return nacls
@@ -1,26 +1,36 @@
-from modules.common import exponential_backoff
+from modules.common import chunked
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_opensearch_clusters(session):
-    os_client = session.client('opensearch')
-    ec2_client = session.client('ec2')
+# describe_domains accepts at most 5 domain names per call
+DOMAIN_BATCH_SIZE = 5
 
-    # 미리 전체 Subnet ID → Name 매핑 수집
-    subnet_name_map = {}
-    subnets = exponential_backoff(ec2_client.describe_subnets)
-    for subnet in subnets['Subnets']:
-        subnet_id = subnet['SubnetId']
-        name_tag = next((tag['Value'] for tag in subnet.get('Tags', []) if tag['Key'] == 'Name'), '-')
-        subnet_name_map[subnet_id] = name_tag
+def describe_domains(os_client, domain_names):
+    # Domain name → DomainStatus, 5개씩 묶어서 병렬 조회
+    batches = fan_out(
+        'opensearch',
+        lambda batch: os_client.describe_domains(DomainNames=batch).get("DomainStatusList", []),
+        chunked(domain_names, DOMAIN_BATCH_SIZE),
+        label=', '.join
+    )
+    statuses = [status for _, batch_statuses, _ in batches for status in batch_statuses or []]
+    return {status["DomainName"]: status for status in statuses}
 
-    domains = exponential_backoff(os_client.list_domain_names).get("DomainNames", [])
+def list_opensearch_clusters(session, context=None):
+    context = context or CollectionContext(session)
+    os_client = context.client('opensearch')
+
+    # 미리 전체 Subnet ID → Name 매핑 수집 (공유 컨텍스트)
+    subnet_name_map = context.subnet_name_map
+
+    domains = fetch_all(os_client, 'list_domain_names', "DomainNames")
+    domain_status = describe_domains(os_client, [domain["DomainName"] for domain in domains if domain.get("DomainName")])
     result = []
 
     for domain in domains:
         domain_name = domain.get("DomainName", "-")
-        domain_info = exponential_backoff(
-            os_client.describe_domain,
-            DomainName=domain_name
-        ).get("DomainStatus", {})
+        domain_info = domain_status.get(domain_name, {})
 
         subnet_ids = domain_info.get("VPCOptions", {}).get("SubnetIds", [])
         subnet_names = [subnet_name_map.get(sid, '-') for sid in subnet_ids]
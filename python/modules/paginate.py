@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules.common import exponential_backoff
+
+_END = object()
+
+
+class PageStats:
+    """Pages / items read per (service, operation), so truncated or unusually deep listings are visible."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, service, operation, pages, items):
+        with self._lock:
+            entry = self._stats.setdefault((service, operation), {'calls': 0, 'pages': 0, 'items': 0, 'max_pages': 0, 'last_pages': 0})
+            entry['calls'] += 1
+            entry['pages'] += pages
+            entry['items'] += items
+            entry['max_pages'] = max(entry['max_pages'], pages)
+            entry['last_pages'] = pages
+
+    def stats(self):
+        with self._lock:
+            entries = sorted(self._stats.items())
+        return [
+            {'Service': service, 'Operation': operation, 'Calls': entry['calls'], 'Pages': entry['pages'],
+             'Items': entry['items'], 'Max Pages': entry['max_pages'], 'Last Pages': entry['last_pages']}
+            for (service, operation), entry in entries
+        ]
+
+
+PAGE_STATS = PageStats()
+
+
+def _pages(client, operation, kwargs):
+    if client.can_paginate(operation):
+        return iter(client.get_paginator(operation).paginate(**kwargs))
+    # Operations without a paginator are a single page
+    return iter([getattr(client, operation)(**kwargs)])
+
+
+def paginate(client, operation, result_key=None, prefetch=True, **kwargs):
+    """
+    Stream every item of `result_key` across all pages of a list/describe call
+    (whole pages when result_key is None).
+
+    With `prefetch`, the next page is requested on a helper thread while the caller
+    works on the current one. The page count of each call is recorded in PAGE_STATS.
+    """
+    service = client.meta.service_model.service_id.hyphenize()
+    pages = _pages(client, operation, kwargs)
+    page_count = item_count = 0
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        upcoming = executor.submit(next, pages, _END) if executor else None
+        while True:
+            page = upcoming.result() if executor else next(pages, _END)
+            if page is _END:
+                break
+            if executor:
+                upcoming = executor.submit(next, pages, _END)
+            page_count += 1
+            if result_key is None:
+                item_count += 1
+                yield page
+            else:
+                items = page.get(result_key, [])
+                item_count += len(items)
+                yield from items
+    finally:
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+        PAGE_STATS.record(service, operation, page_count, item_count)
+
+
+def fetch_all(client, operation, result_key=None, **kwargs):
+    # Whole listing as a list; a listing that stays throttled is restarted through exponential_backoff
+    return exponential_backoff(lambda: list(paginate(client, operation, result_key, **kwargs)))
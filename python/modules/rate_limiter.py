@@ -0,0 +1,153 @@
+import re
+import threading
+import time
+from modules.common import THROTTLE_ERROR_CODES
+
+# Starting / ceiling request rates (per second) for each API family; AIMD moves between floor and ceiling
+DEFAULT_RATE = 10.0
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+SERVICE_RATES = {
+    # service id: (initial rate, max rate)
+    'ec2': (20.0, 100.0),
+    'iam': (5.0, 15.0),
+    'route-53': (4.0, 5.0),
+    'sts': (5.0, 20.0),
+    'ses': (1.0, 1.0),
+    'organizations': (2.0, 5.0),
+}
+ADDITIVE_INCREASE = 0.5      # rate added per second of successful traffic
+MULTIPLICATIVE_DECREASE = 0.5  # rate multiplier on throttle
+DECREASE_COOLDOWN = 1.0      # seconds; a burst of throttles from one wave counts as a single decrease
+LEGACY_MAX_ATTEMPTS = 5      # botocore's total attempts for clients without a standard/adaptive retries config
+
+
+def api_family(operation_name):
+    # DescribeInstances -> Describe, ListRoles -> List, GetBucketPolicy -> Get
+    match = re.match(r'[A-Z][a-z]*', operation_name or '')
+    return match.group(0) if match else operation_name
+
+
+class TokenBucket:
+    def __init__(self, rate, max_rate):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.throttles = 0
+        self.wait_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        # Caller holds the lock; burst capacity is one second worth of tokens
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve a token now (possibly going negative) so concurrent callers queue up fairly
+            self.tokens -= 1.0
+            self.requests += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.wait_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + ADDITIVE_INCREASE / max(self.rate, 1.0))
+
+    def on_throttle(self):
+        with self.lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self.last_decrease >= DECREASE_COOLDOWN:
+                self.rate = max(MIN_RATE, self.rate * MULTIPLICATIVE_DECREASE)
+                self.last_decrease = now
+            # Drain the bucket so every thread sharing it backs off together
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'Rate (req/s)': round(self.rate, 2),
+                'Requests': self.requests,
+                'Throttles': self.throttles,
+                'Wait Seconds': round(self.wait_seconds, 2)
+            }
+
+
+class RateLimiter:
+    """
+    Shared client-side rate limiter: one adaptive token bucket per (account, region, service, API family).
+
+    Hooked into every pooled client through botocore events, so each HTTP attempt (including paginator
+    pages and retries) takes a token first. Throttling responses halve the bucket's rate and successful
+    ones raise it additively (AIMD), which keeps all threads of a run just under the service's limit
+    instead of retrying in lockstep.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def bucket(self, account, region, service_id, family):
+        key = (account, region, service_id, family)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, max_rate = SERVICE_RATES.get(service_id, (DEFAULT_RATE, MAX_RATE))
+                bucket = TokenBucket(rate, max_rate)
+                self._buckets[key] = bucket
+            return bucket
+
+    def register(self, client, account):
+        # account: callable returning the client's account ID, resolved on its first request
+        region = client.meta.region_name
+        service_id = client.meta.service_model.service_id.hyphenize()
+        # Throttle retries stop where botocore's own retry handler stops: the client's retries config is the limit
+        max_attempts = (client.meta.config.retries or {}).get('total_max_attempts', LEGACY_MAX_ATTEMPTS)
+        account_id = None
+
+        def bucket_for(event_name):
+            nonlocal account_id
+            if account_id is None:
+                account_id = account()
+            return self.bucket(account_id, region, service_id, api_family(event_name.rsplit('.', 1)[-1]))
+
+        def before_send(event_name, **kwargs):
+            bucket_for(event_name).acquire()
+
+        def needs_retry(event_name, response=None, attempts=1, **kwargs):
+            if response is None:
+                return None
+            bucket = bucket_for(event_name)
+            error_code = response[1].get('Error', {}).get('Code')
+            if error_code in THROTTLE_ERROR_CODES:
+                bucket.on_throttle()
+                # Retry without sleeping: the drained bucket paces the next attempt
+                return 0 if attempts < max_attempts else None
+            if response[0].status_code < 400:
+                bucket.on_success()
+            return None
+
+        client.meta.events.register(f'before-send.{service_id}', before_send)
+        # Registered first so throttles are paced here rather than by botocore's per-thread backoff
+        client.meta.events.register_first(f'needs-retry.{service_id}', needs_retry)
+
+    def stats(self):
+        with self._lock:
+            buckets = list(self._buckets.items())
+        return [
+            {'Account': account, 'Region': region, 'Service': service, 'API Family': family, **bucket.stats()}
+            for (account, region, service, family), bucket in sorted(buckets, key=lambda item: tuple(map(str, item[0])))
+        ]
+
+
+RATE_LIMITER = RateLimiter()
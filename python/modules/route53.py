@@ -1,13 +1,13 @@
 import pandas as pd
-from modules.common import exponential_backoff
+from modules.paginate import paginate, fetch_all
+from modules.context import CollectionContext
 
 def sanitize_sheet_name(zone_name):
     name = zone_name.replace('.', '_')
     return name[:28] + "..." if len(name) > 31 else name
 
-def list_route53_zones(session):
-    client = session.client('route53')
-    zones = exponential_backoff(client.list_hosted_zones)['HostedZones']
+def list_route53_zones(client):
+    zones = fetch_all(client, 'list_hosted_zones', 'HostedZones')
     zone_summary = []
     for z in zones:
         zone_summary.append({
@@ -18,33 +18,32 @@ def list_route53_zones(session):
         })
     return zones, pd.DataFrame(zone_summary)
 
-def list_zone_record_sets(session, zone_id):
-    client = session.client('route53')
-    paginator = client.get_paginator('list_resource_record_sets')
+def list_zone_record_sets(client, zone_id):
     records = []
-    for page in paginator.paginate(HostedZoneId=zone_id):
-        for record in page['ResourceRecordSets']:
-            alias = 'AliasTarget' in record
-            value = "-"
-            if 'ResourceRecords' in record:
-                value = ", ".join(r['Value'] for r in record['ResourceRecords'])
-            elif alias:
-                value = record['AliasTarget']['DNSName']
-            records.append({
-                "Record name": record['Name'],
-                "Type": record['Type'],
-                "Routing policy": "Simple",
-                "Differentiator": "-",
-                "Alias": "Yes" if alias else "No",
-                "Value / Route traffic to": value,
-                "TTL (seconds)": record.get('TTL', '-'),
-                "Health check ID": record.get('HealthCheckId', '-'),
-                "Evaluate target health": record.get('AliasTarget', {}).get('EvaluateTargetHealth', '-') if alias else '-'
-            })
+    for record in paginate(client, 'list_resource_record_sets', 'ResourceRecordSets', HostedZoneId=zone_id):
+        alias = 'AliasTarget' in record
+        value = "-"
+        if 'ResourceRecords' in record:
+            value = ", ".join(r['Value'] for r in record['ResourceRecords'])
+        elif alias:
+            value = record['AliasTarget']['DNSName']
+        records.append({
+            "Record name": record['Name'],
+            "Type": record['Type'],
+            "Routing policy": "Simple",
+            "Differentiator": "-",
+            "Alias": "Yes" if alias else "No",
+            "Value / Route traffic to": value,
+            "TTL (seconds)": record.get('TTL', '-'),
+            "Health check ID": record.get('HealthCheckId', '-'),
+            "Evaluate target health": record.get('AliasTarget', {}).get('EvaluateTargetHealth', '-') if alias else '-'
+        })
     return pd.DataFrame(records)
 
-def list_route53(session):
-    zones, _ = list_route53_zones(session)
+def list_route53(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('route53')
+    zones, _ = list_route53_zones(client)
     result = []
 
     for z in zones:
@@ -70,7 +69,7 @@ def list_route53(session):
         })
 
         # Add each record as a resource
-        records_df = list_zone_record_sets(session, zone_id)
+        records_df = list_zone_record_sets(client, zone_id)
         for _, row in records_df.iterrows():
             result.append({
                 "Zone Name": zone_name,
@@ -88,15 +87,17 @@ def list_route53(session):
 
     return result
 
-def fetch_route53_data(session):
-    zones, summary_df = list_route53_zones(session)
+def fetch_route53_data(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('route53')
+    zones, summary_df = list_route53_zones(client)
     sheet_dict = {"Hosted Zones": summary_df}
 
     for zone in zones:
         zone_id = zone['Id'].split('/')[-1]
         zone_name = zone['Name'].rstrip('.')
         sheet_name = sanitize_sheet_name(zone_name)
-        records_df = list_zone_record_sets(session, zone_id)
+        records_df = list_zone_record_sets(client, zone_id)
         sheet_dict[sheet_name] = records_df
 
     return sheet_dict
\ No newline at end of file
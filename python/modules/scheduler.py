@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class FairScheduler:
+    """
+    Thread pool shared by several tenants (e.g. AWS accounts) with round-robin dispatch.
+
+    Each tenant has its own queue and may run at most `per_tenant_limit` tasks at once,
+    so one account with many slow collectors cannot starve the others of workers.
+    """
+
+    def __init__(self, max_workers, per_tenant_limit):
+        self._per_tenant_limit = per_tenant_limit
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._running = {}
+        self._rotation = deque()
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, tenant, fn, *args, **kwargs):
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
+            if tenant not in self._queues:
+                self._queues[tenant] = deque()
+                self._running[tenant] = 0
+                self._rotation.append(tenant)
+            self._queues[tenant].append((future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def _next_task(self):
+        # Caller holds the lock: pick the next tenant in rotation that has work and a free slot
+        for _ in range(len(self._rotation)):
+            tenant = self._rotation[0]
+            self._rotation.rotate(-1)
+            if self._queues[tenant] and self._running[tenant] < self._per_tenant_limit:
+                self._running[tenant] += 1
+                return tenant, self._queues[tenant].popleft()
+        return None
+
+    def _has_pending(self):
+        return any(self._queues.values())
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown and not self._has_pending():
+                        return
+                    self._cond.wait()
+                    task = self._next_task()
+
+            tenant, (future, fn, args, kwargs) = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self._cond:
+                self._running[tenant] -= 1
+                self._cond.notify_all()
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=True)
+        return False
+
+
+class DependencyScheduler:
+    """
+    Runs a graph of tasks, each tagged with the AWS service it mostly calls.
+
+    A task starts once all of its dependencies have finished (failed ones included: a
+    dependency only orders work, the dependent reports its own error). At most
+    `max_workers` tasks run at once and at most `service_limits[service]` per service.
+    Among ready tasks the least busy service goes first, then the task with the longest
+    estimated remaining chain (its own estimate plus its longest dependent chain), so the
+    slow collectors and the datasets they wait on start early.
+
+    Setting the optional `cancel` event drops every task that has not started yet; running
+    tasks finish normally.
+    """
+
+    def __init__(self, max_workers, service_limits=None, default_service_limit=3, estimates=None, semaphore=None,
+                 cancel=None):
+        self._max_workers = max_workers
+        self._service_limits = service_limits or {}
+        self._default_service_limit = default_service_limit
+        self._estimates = estimates or {}
+        self._semaphore = semaphore
+        self._cancel = cancel
+        self._tasks = {}
+        self.results = {}
+        self.errors = {}
+        self.cancelled = set()
+        self.timings = {}
+        self._started = None
+        self._finished = None
+
+    def add(self, name, fn, service, deps=()):
+        self._tasks[name] = {'fn': fn, 'service': service, 'deps': [d for d in deps if d != name]}
+
+    def _priorities(self):
+        dependents = {name: [] for name in self._tasks}
+        for name, task in self._tasks.items():
+            for dep in task['deps']:
+                if dep in dependents:
+                    dependents[dep].append(name)
+
+        priorities = {}
+
+        def chain(name):
+            if name not in priorities:
+                below = max((chain(child) for child in dependents[name]), default=0.0)
+                priorities[name] = self._estimates.get(name, 1.0) + below
+            return priorities[name]
+
+        for name in self._tasks:
+            chain(name)
+        return priorities
+
+    def _limit(self, service):
+        return self._service_limits.get(service, self._default_service_limit)
+
+    def _execute(self, fn):
+        # Optional semaphore shared with other schedulers (e.g. every region of a sweep)
+        if self._semaphore is None:
+            return self._timed(fn)
+        with self._semaphore:
+            return self._timed(fn)
+
+    @staticmethod
+    def _timed(fn):
+        started = time.monotonic()
+        try:
+            return started, fn(), None
+        except Exception as e:
+            return started, None, e
+
+    def run(self, on_done=None):
+        # on_done(name, result, error) is called from this thread as each task finishes
+        priorities = self._priorities()
+        order = {name: index for index, name in enumerate(self._tasks)}
+        pending = set(self._tasks)
+        finished = set()
+        running = {}
+        busy = {}
+        self._started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while pending or running:
+                if self._cancel is not None and self._cancel.is_set() and pending:
+                    self.cancelled.update(pending)
+                    pending.clear()
+                ready = [
+                    name for name in pending
+                    if all(dep in finished or dep not in self._tasks for dep in self._tasks[name]['deps'])
+                ]
+                while ready and len(running) < self._max_workers:
+                    candidates = [
+                        name for name in ready
+                        if busy.get(self._tasks[name]['service'], 0) < self._limit(self._tasks[name]['service'])
+                    ]
+                    if not candidates:
+                        break
+                    name = min(candidates, key=lambda n: (busy.get(self._tasks[n]['service'], 0), -priorities[n], order[n]))
+                    ready.remove(name)
+                    pending.discard(name)
+                    service = self._tasks[name]['service']
+                    busy[service] = busy.get(service, 0) + 1
+                    running[executor.submit(self._execute, self._tasks[name]['fn'])] = name
+
+                if not running:
+                    # Only reachable with a dependency cycle; run the rest regardless of order
+                    for name in pending:
+                        self._tasks[name]['deps'] = []
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    ended = time.monotonic()
+                    service = self._tasks[name]['service']
+                    busy[service] -= 1
+                    finished.add(name)
+                    started, result, error = future.result()
+                    if error is None:
+                        self.results[name] = result
+                    else:
+                        self.errors[name] = error
+                    self.timings[name] = (started - self._started, ended - self._started)
+                    if on_done:
+                        on_done(name, result, error)
+
+        self._finished = time.monotonic()
+        return self.results
+
+    def critical_path(self):
+        # Walk back from the last task to finish through whichever dependency finished last
+        if not self.timings:
+            return []
+        path = []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        while name is not None:
+            path.append(name)
+            deps = [d for d in self._tasks[name]['deps'] if d in self.timings]
+            name = max(deps, key=lambda d: self.timings[d][1]) if deps else None
+        return list(reversed(path))
+
+    def report(self):
+        def entry(name):
+            started, ended = self.timings[name]
+            return {
+                'task': name,
+                'service': self._tasks[name]['service'],
+                'start': round(started, 2),
+                'end': round(ended, 2),
+                'seconds': round(ended - started, 2),
+                'error': str(self.errors[name]) if name in self.errors else None
+            }
+
+        return {
+            'elapsed_seconds': round((self._finished or time.monotonic()) - self._started, 2) if self._started else 0,
+            'critical_path': [entry(name) for name in self.critical_path()],
+            'tasks': sorted((entry(name) for name in self.timings), key=lambda e: e['start'])
+        }
@@ -1,12 +1,12 @@
-from modules.common import exponential_backoff
-
-def list_secrets_manager(session):
-    client = session.client('secretsmanager')
-    secrets = exponential_backoff(client.list_secrets).get("SecretList", [])
+from modules.paginate import paginate
+from modules.context import CollectionContext
 
+def list_secrets_manager(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('secretsmanager')
     result = []
 
-    for secret in secrets:
+    for secret in paginate(client, 'list_secrets', "SecretList"):
         created_date = secret.get("CreatedDate")
         created_date_str = created_date.astimezone().replace(tzinfo=None).isoformat() if created_date else "-"
 
@@ -1,14 +1,42 @@
-from modules.common import exponential_backoff
+from modules.common import exponential_backoff, chunked
+from modules.fanout import fan_out
+from modules.paginate import paginate
+from modules.context import CollectionContext
 
-def list_ses_identities(session):
-    client = session.client('ses')
-    identities = exponential_backoff(client.list_identities).get("Identities", [])
+# get_identity_*_attributes accept at most 100 identities per call
+IDENTITY_BATCH_SIZE = 100
+
+def list_identities(client):
+    return list(paginate(client, 'list_identities', "Identities"))
+
+def get_identity_attributes(client, operation, result_key, identities):
+    # Identity → attributes, 100개씩 묶어서 병렬 조회
+    batches = fan_out(
+        'ses',
+        lambda batch: getattr(client, operation)(Identities=batch).get(result_key, {}),
+        chunked(identities, IDENTITY_BATCH_SIZE),
+        label=lambda batch: f"{result_key} of {len(batch)} identities"
+    )
+    attributes = {}
+    for _, batch_attributes, _ in batches:
+        attributes.update(batch_attributes or {})
+    return attributes
+
+def list_ses_identities(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('ses')
+    identities = exponential_backoff(list_identities, client)
+
+    verification_attributes = get_identity_attributes(
+        client, 'get_identity_verification_attributes', "VerificationAttributes", identities
+    )
+    dkim_attributes = get_identity_attributes(client, 'get_identity_dkim_attributes', "DkimAttributes", identities)
 
     result = []
 
     for identity in identities:
-        attrs = exponential_backoff(client.get_identity_verification_attributes, Identities=[identity]).get("VerificationAttributes", {}).get(identity, {})
-        dkim_attrs = exponential_backoff(client.get_identity_dkim_attributes, Identities=[identity]).get("DkimAttributes", {}).get(identity, {})
+        attrs = verification_attributes.get(identity, {})
+        dkim_attrs = dkim_attributes.get(identity, {})
 
         result.append({
             "Identity": identity,
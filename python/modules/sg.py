@@ -1,26 +1,21 @@
-from modules.common import exponential_backoff
+from modules.context import CollectionContext
 
-def list_security_groups(session):
-    ec2_client = session.client('ec2')
+def list_security_groups(session, context=None):
+    context = context or CollectionContext(session)
     security_groups = []
 
     try:
         # Retrieve all security groups
-        response = exponential_backoff(ec2_client.describe_security_groups)
-        all_sgs = response['SecurityGroups']
+        all_sgs = context.security_groups
 
         # Find all security group IDs that are in use by ENIs
-        eni_response = exponential_backoff(ec2_client.describe_network_interfaces)
-        used_sg_ids = set()
-        for eni in eni_response['NetworkInterfaces']:
-            for group in eni.get('Groups', []):
-                used_sg_ids.add(group['GroupId'])
+        used_sg_ids = context.used_security_group_ids
 
         for sg in all_sgs:
             security_group_name = sg.get('GroupName', '-')
             security_group_id = sg.get('GroupId', '-')
             description = sg.get('Description', '-')
-            region = session.region_name
+            region = context.region_name
 
             usage_flag = security_group_id in used_sg_ids
 
@@ -59,6 +54,7 @@ def list_security_groups(session):
 
     except Exception as e:
         print(f"Error retrieving security groups: {e}")
+        raise
 
     return security_groups
 
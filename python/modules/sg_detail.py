@@ -1,16 +1,15 @@
-from modules.common import exponential_backoff
+from modules.context import CollectionContext
 import re
 import pandas as pd
 
-def fetch_all_sg_data(session):
-    ec2 = session.client('ec2')
-    region = session.region_name
+def fetch_all_sg_data(session, context=None):
+    context = context or CollectionContext(session)
+    region = context.region_name
 
-    sg_data = exponential_backoff(ec2.describe_security_groups)
-    eni_data = exponential_backoff(ec2.describe_network_interfaces)
-    ec2_data = exponential_backoff(ec2.describe_instances)
+    sg_data = {'SecurityGroups': context.security_groups}
+    eni_data = {'NetworkInterfaces': context.network_interfaces}
 
-    ec2_name_map = build_ec2_name_map(ec2_data)
+    ec2_name_map = build_ec2_name_map(context.instances)
 
     sg_summary = pd.DataFrame(map_sg_summary(region, sg_data, eni_data, ec2_name_map))
     sg_rules = pd.DataFrame(map_sg_rules_with_resources(region, sg_data, eni_data, ec2_name_map))
@@ -22,11 +21,10 @@ def fetch_all_sg_data(session):
         sg_findings
     )
 
-def build_ec2_name_map(ec2_data):
+def build_ec2_name_map(instances):
     return {
         inst.get("InstanceId"): next((tag.get("Value") for tag in inst.get("Tags", []) if tag.get("Key") == "Name"), "-")
-        for res in ec2_data.get("Reservations", [])
-        for inst in res.get("Instances", [])
+        for inst in instances
     }
 
 def infer_resource_type(description, interface_type):
@@ -0,0 +1,157 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Snapshot:
+    def __init__(self, profile, region, resource, collected_at, data, ttl):
+        self.profile = profile
+        self.region = region
+        self.resource = resource
+        self.collected_at = collected_at
+        self.data = data
+        self.ttl = ttl
+
+    @property
+    def age(self):
+        return max(0.0, time.time() - self.collected_at)
+
+    @property
+    def is_fresh(self):
+        return self.age < self.ttl
+
+    def describe(self):
+        return {
+            "collected_at": datetime.fromtimestamp(self.collected_at).isoformat(timespec='seconds'),
+            "age_seconds": int(self.age),
+            "ttl_seconds": self.ttl,
+            "fresh": self.is_fresh
+        }
+
+
+class SnapshotStore:
+    """
+    Local SQLite store of collected inventory keyed by (profile, region, resource, collected_at).
+
+    Collector output (row lists, or DataFrames for the detail collectors) is pickled as-is, so a
+    snapshot can stand in for a live collection anywhere. Only the newest `keep` snapshots of each
+    (profile, region, resource) are kept. Snapshots younger than `ttl` seconds are fresh; stale
+    ones are still served by the dashboard while `refresh_async` collects a new one in the background.
+    """
+
+    def __init__(self, path, ttl, keep=5, refresh_workers=4):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.keep = keep
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    profile TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    resource TEXT NOT NULL,
+                    collected_at REAL NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (profile, region, resource, collected_at)
+                )
+            """)
+
+    def _connect(self):
+        # One short-lived connection per operation keeps the store safe to use from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, profile, region, resource, data):
+        collected_at = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                (profile, region, resource, collected_at, pickle.dumps(data))
+            )
+            conn.execute(
+                """
+                DELETE FROM snapshots
+                WHERE profile = ? AND region = ? AND resource = ? AND collected_at NOT IN (
+                    SELECT collected_at FROM snapshots
+                    WHERE profile = ? AND region = ? AND resource = ?
+                    ORDER BY collected_at DESC LIMIT ?
+                )
+                """,
+                (profile, region, resource, profile, region, resource, self.keep)
+            )
+        return Snapshot(profile, region, resource, collected_at, data, self.ttl)
+
+    def latest(self, profile, region, resource):
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT collected_at, data FROM snapshots
+                WHERE profile = ? AND region = ? AND resource = ?
+                ORDER BY collected_at DESC LIMIT 1
+                """,
+                (profile, region, resource)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            data = pickle.loads(row[1])
+        except Exception as e:
+            print(f"[WARN] Unreadable snapshot {profile}/{region}/{resource}: {e}")
+            return None
+        return Snapshot(profile, region, resource, row[0], data, self.ttl)
+
+    def fresh(self, profile, region, resource):
+        snapshot = self.latest(profile, region, resource)
+        return snapshot if snapshot is not None and snapshot.is_fresh else None
+
+    def has_fresh(self, profile, region, resource):
+        # Freshness check without unpickling the data
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(collected_at) FROM snapshots WHERE profile = ? AND region = ? AND resource = ?",
+                (profile, region, resource)
+            ).fetchone()
+        return row[0] is not None and time.time() - row[0] < self.ttl
+
+    def describe_latest(self, profile, region, resource):
+        # describe() of the newest snapshot without unpickling its data (None when there is none)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(collected_at) FROM snapshots WHERE profile = ? AND region = ? AND resource = ?",
+                (profile, region, resource)
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return Snapshot(profile, region, resource, row[0], None, self.ttl).describe()
+
+    def refresh_async(self, profile, region, resource, collect):
+        # At most one background refresh per key; `collect` is expected to save the new snapshot
+        key = (profile, region, resource)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                collect(profile, region, resource)
+            except Exception as e:
+                print(f"[ERROR] Background refresh of {resource} ({profile}/{region}) failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(run)
+        return True
+
+    def is_refreshing(self, profile, region, resource):
+        with self._lock:
+            return (profile, region, resource) in self._refreshing
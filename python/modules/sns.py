@@ -1,14 +1,23 @@
-from modules.common import exponential_backoff
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 
-def list_sns_topics(session):
-    client = session.client('sns')
-    topics = exponential_backoff(client.list_topics).get("Topics", [])
+def list_sns_topics(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('sns')
+    topics = fetch_all(client, 'list_topics', "Topics")
+
+    # get_topic_attributes 병렬 조회 (토픽별 실패는 해당 행만 '-' 처리)
+    details = fan_out(
+        'sns', lambda topic: client.get_topic_attributes(TopicArn=topic["TopicArn"]), topics,
+        label=lambda topic: topic.get("TopicArn")
+    )
 
     result = []
 
-    for topic in topics:
+    for topic, response, _ in details:
         topic_arn = topic.get("TopicArn", "-")
-        attrs = exponential_backoff(client.get_topic_attributes, TopicArn=topic_arn).get("Attributes", {})
+        attrs = (response or {}).get("Attributes", {})
 
         result.append({
             "Topic ARN": topic_arn,
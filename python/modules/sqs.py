@@ -1,29 +1,33 @@
-from modules.common import exponential_backoff
+from modules.fanout import fan_out
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 from datetime import datetime
 
-def list_sqs_queues(session):
-    client = session.client('sqs')
-    queue_urls = exponential_backoff(client.list_queues).get("QueueUrls", [])
+def list_sqs_queues(session, context=None):
+    context = context or CollectionContext(session)
+    client = context.client('sqs')
+    queue_urls = fetch_all(client, 'list_queues', "QueueUrls")
+
+    # get_queue_attributes 병렬 조회 (큐별 실패는 해당 행만 '-' 처리)
+    details = fan_out(
+        'sqs', lambda queue_url: client.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['All']), queue_urls
+    )
 
     result = []
 
-    for queue_url in queue_urls:
-        attrs = exponential_backoff(
-            client.get_queue_attributes,
-            QueueUrl=queue_url,
-            AttributeNames=['All']
-        ).get("Attributes", {})
+    for queue_url, response, _ in details:
+        attrs = (response or {}).get("Attributes", {})
 
         # Unix timestamp → datetime 변환 (문자열로 변환)
         created_ts = attrs.get("CreatedTimestamp")
         last_modified_ts = attrs.get("LastModifiedTimestamp")
 
         created_dt = (
-            datetime.utcfromtimestamp(int(created_ts)).strftime('%Y-%m-%d %H:%M:%S')
+            datetime.utcfromtimestamp(int(float(created_ts))).strftime('%Y-%m-%d %H:%M:%S')
             if created_ts else "-"
         )
         last_modified_dt = (
-            datetime.utcfromtimestamp(int(last_modified_ts)).strftime('%Y-%m-%d %H:%M:%S')
+            datetime.utcfromtimestamp(int(float(last_modified_ts))).strftime('%Y-%m-%d %H:%M:%S')
             if last_modified_ts else "-"
         )
 
@@ -1,5 +1,5 @@
 from botocore.exceptions import ClientError
-from modules.common import exponential_backoff
+from modules.context import CollectionContext
 
 def get_tag_value(tags, key):
     for tag in tags:
@@ -7,13 +7,35 @@ def get_tag_value(tags, key):
             return tag['Value']
     return 'Unnamed'
 
-def list_subnets(session):
+def index_route_tables(route_tables):
+    # Subnet ID → explicitly associated route tables, VPC ID → main route table
+    by_subnet, main_by_vpc = {}, {}
+    for route_table in route_tables:
+        for association in route_table.get('Associations', []):
+            if association.get('SubnetId'):
+                by_subnet.setdefault(association['SubnetId'], []).append(route_table)
+            if association.get('Main'):
+                main_by_vpc[route_table['VpcId']] = route_table
+    return by_subnet, main_by_vpc
+
+def index_network_acls(network_acls):
+    # Every subnet is associated with exactly one NACL (the VPC default unless set explicitly)
+    by_subnet = {}
+    for acl in network_acls:
+        for association in acl.get('Associations', []):
+            if association.get('SubnetId'):
+                by_subnet.setdefault(association['SubnetId'], []).append(acl)
+    return by_subnet
+
+def list_subnets(session, context=None):
+    context = context or CollectionContext(session)
     subnet_data = []
     try:
-        ec2_client = session.client('ec2')
-        
-        subnets = exponential_backoff(ec2_client.describe_subnets)['Subnets']
-        
+        # 서브넷 / 라우팅 테이블 / NACL은 한 번씩만 조회하고 메모리에서 매핑 (공유 컨텍스트)
+        subnets = context.subnets
+        route_tables_by_subnet, main_route_table_by_vpc = index_route_tables(context.route_tables)
+        network_acls_by_subnet = index_network_acls(context.network_acls)
+
         for subnet in subnets:
             subnet_id = subnet['SubnetId']
             cidr_block = subnet['CidrBlock']
@@ -25,10 +47,10 @@ def list_subnets(session):
             subnet_name = get_tag_value(subnet.get('Tags', []), 'Name')
             
             # Route Tables
-            route_tables = exponential_backoff(
-                ec2_client.describe_route_tables,
-                Filters=[{'Name': 'association.subnet-id', 'Values': [subnet_id]}]
-            ).get('RouteTables', [])
+            # 명시적 연결이 없으면 VPC의 Main 라우팅 테이블 사용
+            route_tables = route_tables_by_subnet.get(subnet_id)
+            if not route_tables:
+                route_tables = [main_route_table_by_vpc[vpc_id]] if vpc_id in main_route_table_by_vpc else []
             
             route_table_ids = ', '.join([rtb['RouteTableId'] for rtb in route_tables]) if route_tables else 'None'
             route_table_names = ', '.join([get_tag_value(rtb.get('Tags', []), 'Name') for rtb in route_tables]) if route_tables else 'None'
@@ -48,10 +70,7 @@ def list_subnets(session):
             igw_nat_tg_str = ', '.join(sorted(igw_nat_tg)) if igw_nat_tg else 'None'
             
             # Network ACLs
-            network_acls = exponential_backoff(
-                ec2_client.describe_network_acls,
-                Filters=[{'Name': 'association.subnet-id', 'Values': [subnet_id]}]
-            ).get('NetworkAcls', [])
+            network_acls = network_acls_by_subnet.get(subnet_id, [])
             
             network_acl_ids = ', '.join([acl['NetworkAclId'] for acl in network_acls]) if network_acls else 'None'
             network_acl_names = ', '.join([get_tag_value(acl.get('Tags', []), 'Name') for acl in network_acls]) if network_acls else 'None'
@@ -77,4 +96,5 @@ def list_subnets(session):
             })
     except ClientError as e:
         print(f"Error retrieving Subnets: {e}")
+        raise
     return subnet_data
@@ -1,4 +1,9 @@
-from modules.common import exponential_backoff
+from modules.common import exponential_backoff, chunked
+from modules.fanout import fan_out
+from modules.context import CollectionContext
+
+# describe_load_balancers / describe_tags accept at most 20 ARNs per call
+LB_ARN_BATCH_SIZE = 20
 
 def get_tag_value(tags, key):
     for tag in tags:
@@ -6,18 +11,75 @@ def get_tag_value(tags, key):
             return tag['Value']
     return '-'
 
-def list_target_groups(session):
-    elbv2_client = session.client('elbv2')
-    ec2_client = session.client('ec2')
+def describe_lb_name_tags(context, elbv2_client, lb_arns):
+    # LB ARN → Name 태그: 태그 인덱스에 있는 LB는 바로 사용,
+    # 나머지만 존재 여부 확인 후 20개씩 묶어서 한 번만 조회
+    names = {}
+    for lb_arn in lb_arns:
+        tags = context.tags_of(lb_arn)
+        if tags is not None:
+            names[lb_arn] = get_tag_value(tags, 'Name')
+    for batch in chunked(sorted(set(lb_arns) - set(names)), LB_ARN_BATCH_SIZE):
+        try:
+            existing = [
+                lb['LoadBalancerArn'] for lb in exponential_backoff(
+                    elbv2_client.describe_load_balancers, LoadBalancerArns=batch
+                )['LoadBalancers']
+            ]
+        except Exception as e:
+            # A deleted LB fails the whole batch; check that batch one ARN at a time
+            print(f"Error retrieving load balancers for batch of {len(batch)}: {e}")
+            existing = []
+            for lb_arn in batch:
+                try:
+                    exponential_backoff(elbv2_client.describe_load_balancers, LoadBalancerArns=[lb_arn])
+                    existing.append(lb_arn)
+                except Exception as e:
+                    print(f"Error retrieving load balancer name for ARN {lb_arn}: {e}")
+        if not existing:
+            continue
+        try:
+            tags = exponential_backoff(elbv2_client.describe_tags, ResourceArns=existing)
+            for desc in tags['TagDescriptions']:
+                names[desc['ResourceArn']] = get_tag_value(desc.get('Tags', []), 'Name')
+        except Exception as e:
+            print(f"Error retrieving load balancer tags for batch of {len(existing)}: {e}")
+    return names
+
+def list_target_groups(session, context=None):
+    context = context or CollectionContext(session)
+    elbv2_client = context.client('elbv2')
     target_groups_data = []
 
     try:
-        target_groups = exponential_backoff(elbv2_client.describe_target_groups)
-        if 'TargetGroups' not in target_groups or not target_groups['TargetGroups']:
+        # 공유 컨텍스트의 Target Group 목록 (페이지네이션, ASG 수집과 공유)
+        target_groups = context.target_groups
+        if not target_groups:
             print("No target groups found.")
             return target_groups_data
 
-        for target_group in target_groups['TargetGroups']:
+        # Target health per TG, fetched in parallel (results keep TG order)
+        target_health = fan_out(
+            'elbv2',
+            lambda tg: elbv2_client.describe_target_health(TargetGroupArn=tg['TargetGroupArn'])['TargetHealthDescriptions'],
+            target_groups,
+            label=lambda tg: tg['TargetGroupName']
+        )
+
+        # Instance targets: shared index first, describe_instances only for the IDs it misses
+        instance_by_id = context.find_instances({
+            desc['Target']['Id']
+            for tg, health_descriptions, _ in target_health
+            if tg['TargetType'] == 'instance'
+            for desc in health_descriptions or []
+        })
+
+        # Load Balancer 이름 매핑 (여러 TG가 공유하는 LB도 한 번만 조회)
+        lb_name_map = describe_lb_name_tags(
+            context, elbv2_client, {arn for tg in target_groups for arn in tg.get('LoadBalancerArns', [])}
+        )
+
+        for target_group, health_descriptions, health_error in target_health:
             tg_name = target_group['TargetGroupName']
             tg_protocol = target_group['Protocol']
             tg_target_type = target_group['TargetType']
@@ -31,28 +93,21 @@ def list_target_groups(session):
 
             instance_data = []
             try:
-                health_descriptions = exponential_backoff(
-                    elbv2_client.describe_target_health,
-                    TargetGroupArn=target_group['TargetGroupArn']
-                )
-                for desc in health_descriptions['TargetHealthDescriptions']:
+                if health_error is not None:
+                    raise health_error
+                for desc in health_descriptions:
                     instance_id = desc['Target']['Id']
                     health_status = desc['TargetHealth']['State']
                     zone = '-'
                     instance_name = "-"
 
                     if tg_target_type == 'instance':
-                        try:
-                            instance_info = exponential_backoff(
-                                ec2_client.describe_instances,
-                                InstanceIds=[instance_id]
-                            )
-                            for reservation in instance_info['Reservations']:
-                                for instance in reservation['Instances']:
-                                    zone = instance['Placement']['AvailabilityZone']
-                                    instance_name = get_tag_value(instance.get('Tags', []), 'Name')
-                        except Exception as e:
-                            print(f"Error retrieving instance details for instance ID {instance_id}: {e}")
+                        instance = instance_by_id.get(instance_id)
+                        if instance:
+                            zone = instance['Placement']['AvailabilityZone']
+                            instance_name = get_tag_value(instance.get('Tags', []), 'Name')
+                        else:
+                            print(f"Error retrieving instance details for instance ID {instance_id}: not found")
 
                     instance_data.append({
                         'Name': tg_name,
@@ -94,23 +149,10 @@ def list_target_groups(session):
             # Load Balancer 이름 매핑
             lb_names = "-"
             if tg_load_balancer_arns:
-                lb_names_list = []
-                for lb_arn in tg_load_balancer_arns:
-                    try:
-                        lb_description = exponential_backoff(
-                            elbv2_client.describe_load_balancers,
-                            LoadBalancerArns=[lb_arn]
-                        )
-                        for lb in lb_description['LoadBalancers']:
-                            tags = exponential_backoff(
-                                elbv2_client.describe_tags,
-                                ResourceArns=[lb_arn]
-                            )
-                            lb_name = get_tag_value(tags['TagDescriptions'][0].get('Tags', []), 'Name')
-                            if lb_name != '-':
-                                lb_names_list.append(lb_name)
-                    except Exception as e:
-                        print(f"Error retrieving load balancer name for ARN {lb_arn}: {e}")
+                lb_names_list = [
+                    lb_name_map[lb_arn] for lb_arn in tg_load_balancer_arns
+                    if lb_name_map.get(lb_arn, '-') != '-'
+                ]
                 lb_names = ', '.join(lb_names_list)
 
             # Load Balancer 이름 적용
@@ -121,5 +163,6 @@ def list_target_groups(session):
 
     except Exception as e:
         print(f"Error retrieving target groups: {e}")
+        raise
 
     return target_groups_data
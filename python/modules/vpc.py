@@ -1,15 +1,34 @@
-from modules.common import exponential_backoff
+from modules.paginate import fetch_all
+from modules.context import CollectionContext
 import ipaddress
 
-def list_vpcs(session):
+def group_by_vpc(items, vpc_ids_of):
+    grouped = {}
+    for item in items:
+        for vpc_id in vpc_ids_of(item):
+            grouped.setdefault(vpc_id, []).append(item)
+    return grouped
+
+def list_vpcs(session, context=None):
+    context = context or CollectionContext(session)
     vpc_data = []
     try:
-        # Get AWS account ID
-        sts_client = session.client('sts')
-        account_id = sts_client.get_caller_identity()["Account"]
+        # Get AWS account ID (공유 컨텍스트)
+        account_id = context.account_id
+
+        ec2_client = context.client('ec2')
+        vpcs = fetch_all(ec2_client, 'describe_vpcs', 'Vpcs')
 
-        ec2_client = session.client('ec2')
-        vpcs = exponential_backoff(ec2_client.describe_vpcs)['Vpcs']
+        # 서브넷 / NAT / IGW는 한 번씩 조회해서 VPC ID 기준으로 그룹화 (서브넷은 공유 컨텍스트)
+        subnets_by_vpc = group_by_vpc(context.subnets, lambda subnet: [subnet['VpcId']])
+        nat_gateways_by_vpc = group_by_vpc(
+            fetch_all(ec2_client, 'describe_nat_gateways', 'NatGateways'),
+            lambda nat: [nat['VpcId']] if nat.get('VpcId') else []
+        )
+        internet_gateways_by_vpc = group_by_vpc(
+            fetch_all(ec2_client, 'describe_internet_gateways', 'InternetGateways'),
+            lambda igw: [attachment['VpcId'] for attachment in igw.get('Attachments', []) if attachment.get('VpcId')]
+        )
 
         for vpc in vpcs:
             vpc_id = vpc['VpcId']
@@ -21,10 +40,7 @@ def list_vpcs(session):
             total_ips = cidr.num_addresses - 2  # Subtracting network and broadcast addresses
 
             # Get subnets in the VPC
-            subnets = exponential_backoff(
-                ec2_client.describe_subnets,
-                Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}]
-            )['Subnets']
+            subnets = subnets_by_vpc.get(vpc_id, [])
 
             # Calculate available IPs in subnets
             available_ips = sum(subnet['AvailableIpAddressCount'] for subnet in subnets)
@@ -33,17 +49,11 @@ def list_vpcs(session):
             name_tag = next((tag['Value'] for tag in vpc.get('Tags', []) if tag['Key'] == 'Name'), 'Unnamed')
 
             # NAT Gateways
-            nat_gateways = exponential_backoff(
-                ec2_client.describe_nat_gateways,
-                Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}]
-            )['NatGateways']
+            nat_gateways = nat_gateways_by_vpc.get(vpc_id, [])
             nat_gateway_ids = ', '.join([nat['NatGatewayId'] for nat in nat_gateways]) if nat_gateways else '-'
 
             # Internet Gateways
-            internet_gateways = exponential_backoff(
-                ec2_client.describe_internet_gateways,
-                Filters=[{'Name': 'attachment.vpc-id', 'Values': [vpc_id]}]
-            )['InternetGateways']
+            internet_gateways = internet_gateways_by_vpc.get(vpc_id, [])
             internet_gateway_ids = ', '.join([igw['InternetGatewayId'] for igw in internet_gateways]) if internet_gateways else '-'
 
             # Append the gathered data to the list
@@ -60,4 +70,5 @@ def list_vpcs(session):
             })
     except Exception as e:
         print(f"Error retrieving VPCs: {e}")
+        raise
     return vpc_data
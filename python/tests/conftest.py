@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Tests run from python/ (`python -m pytest`) against fake credentials; nothing reaches AWS
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update({
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_SESSION_TOKEN": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_CONFIG_FILE": os.devnull,
+    "AWS_SHARED_CREDENTIALS_FILE": os.devnull,
+    "INVENTORY_SNAPSHOT_DB": os.path.join(tempfile.mkdtemp(), "snapshots.sqlite3"),
+})
+os.environ.pop("AWS_PROFILE", None)
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+import app
+
+
+def test_collect_accounts_keeps_per_service_caps_per_account(monkeypatch):
+    keys = [f"zone-{i}" for i in range(6)]
+    monkeypatch.setattr(app, "RESOURCE_MAP", {key: None for key in keys})
+    monkeypatch.setattr(app, "DETAIL_RESOURCE_MAP", {})
+    monkeypatch.setattr(app, "COLLECTOR_DEPENDENCIES", {key: ("route53", []) for key in keys})
+    monkeypatch.setattr(app, "get_session", lambda profile, region: SimpleNamespace(profile_name=profile, region_name=region))
+
+    lock = threading.Lock()
+    running = Counter()
+    peak = Counter()
+
+    def fake_run_collector(key, func, session, context, refresh, progress):
+        with lock:
+            running[session.profile_name] += 1
+            peak[session.profile_name] = max(peak[session.profile_name], running[session.profile_name])
+        time.sleep(0.05)
+        with lock:
+            running[session.profile_name] -= 1
+        return [{"key": key}]
+
+    monkeypatch.setattr(app, "run_collector", fake_run_collector)
+    results = app.collect_accounts(["a", "b"], "us-east-1")
+
+    assert peak == {"a": app.SERVICE_MAX_WORKERS["route53"], "b": app.SERVICE_MAX_WORKERS["route53"]}
+    assert all(len(inventory) == len(keys) for inventory, _ in results.values())
+
+
+def test_failed_collection_is_not_saved_as_snapshot():
+    context = SimpleNamespace(profile_name="failing", region_name="us-east-1")
+
+    def collector(session, context=None):
+        raise RuntimeError("Throttling")
+
+    with pytest.raises(RuntimeError):
+        app.run_collector("vpcs", collector, None, context)
+    assert app.SNAPSHOT_STORE.latest("failing", "us-east-1", "vpcs") is None
+
+    # A collection that legitimately finds nothing is still stored
+    app.run_collector("vpcs", lambda session, context=None: [], None, context)
+    assert app.SNAPSHOT_STORE.latest("failing", "us-east-1", "vpcs").data == []
+
+
+def test_collector_errors_propagate_instead_of_empty_rows():
+    from modules import ebs
+
+    class BrokenContext:
+        @property
+        def volumes(self):
+            raise RuntimeError("AccessDenied")
+
+    with pytest.raises(RuntimeError):
+        ebs.list_ebs_volumes(None, BrokenContext())
+
+
+def test_global_and_us_east_1_runs_keep_separate_estimates(monkeypatch):
+    collector = lambda session, context=None: []
+    monkeypatch.setattr(app, "RESOURCE_MAP", {"s3": collector, "vpcs": collector})
+    monkeypatch.setattr(app, "DETAIL_RESOURCE_MAP", {})
+    monkeypatch.setattr(app, "COLLECTOR_DEPENDENCIES", {})
+    monkeypatch.setattr(app, "get_session", lambda profile, region: SimpleNamespace(profile_name=profile, region_name=region))
+
+    app.collect_region("estimates", "us-east-1", scope="regional")
+    app.collect_region("estimates", app.GLOBAL_REGION, scope="global")
+
+    assert set(app.TASK_ESTIMATES[("estimates", "us-east-1")]) == {"vpcs"}
+    assert set(app.TASK_ESTIMATES[("estimates", app.GLOBAL_REGION)]) == {"s3"}
+    assert app.SCHEDULE_REPORTS[("estimates", app.GLOBAL_REGION)]["region"] == app.GLOBAL_REGION
+
+
+def test_stream_serves_stale_snapshots_and_reports_snapshot_age(monkeypatch):
+    live_calls = []
+
+    def live_collector(session, context=None):
+        live_calls.append(context.region_name)
+        return [{"VpcId": "vpc-1"}]
+
+    monkeypatch.setattr(app, "RESOURCE_MAP", {"vpcs": live_collector, "s3": lambda session, context=None: []})
+    monkeypatch.setattr(app, "COLLECTOR_DEPENDENCIES", {})
+    monkeypatch.setattr(app, "get_session", lambda profile, region: SimpleNamespace(profile_name=profile, region_name=region))
+    refreshed = []
+    monkeypatch.setattr(app.SNAPSHOT_STORE, "refresh_async", lambda *args: refreshed.append(args[:3]))
+    app.SNAPSHOT_STORE.save("streaming", app.GLOBAL_REGION, "s3", [{"Bucket Name": "alpha"}])
+    monkeypatch.setattr(app.SNAPSHOT_STORE, "ttl", 0)
+
+    body = app.app.test_client().get("/stream?profile=streaming&region=us-east-1").get_data(as_text=True)
+    events = {}
+    for block in body.split("\n\n"):
+        if block.startswith("event: resource"):
+            data = json.loads(block.split("data: ", 1)[1])
+            events[data["resource"]] = data
+
+    # The stale S3 snapshot is served as-is and refreshed in the background, like /api does
+    assert events["s3"]["rows"] == [["alpha"]]
+    assert events["s3"]["snapshot"]["fresh"] is False
+    assert refreshed == [("streaming", app.GLOBAL_REGION, "s3")]
+    # Collectors without a snapshot run live and report the snapshot they just stored
+    assert live_calls == ["us-east-1"]
+    assert events["vpcs"]["rows"] == [["vpc-1"]]
+    assert events["vpcs"]["snapshot"]["age_seconds"] == 0
@@ -0,0 +1,45 @@
+import threading
+import boto3
+from moto import mock_aws
+from modules.client_pool import ClientPool
+from modules.rate_limiter import RATE_LIMITER
+
+
+def test_clients_are_reused_per_profile_region_service():
+    pool = ClientPool()
+    session = pool.session(None, "us-east-1")
+    client = pool.client(session, "sqs")
+    assert pool.client(session, "sqs") is client
+    assert pool.client(pool.session(None, "us-east-1"), "sqs") is client
+    assert pool.client(session, "sqs", "us-west-2") is not client
+    assert pool.client(session, "sqs", "us-west-2").meta.region_name == "us-west-2"
+
+
+def test_caller_built_session_keeps_its_credentials():
+    pool = ClientPool()
+    assumed = boto3.Session(aws_access_key_id="ASSUMED", aws_secret_access_key="secret", region_name="us-east-1")
+    client = pool.client(assumed, "sqs")
+    assert client._request_signer._credentials.access_key == "ASSUMED"
+    assert pool.client(assumed, "sqs") is client
+    assert pool.client(pool.session(None, "us-east-1"), "sqs") is not client
+
+
+def test_creation_only_locks_its_own_key():
+    pool = ClientPool()
+    busy = pool._key_lock((None, "us-east-1"))
+    created = threading.Event()
+    with busy:
+        thread = threading.Thread(target=lambda: (pool.session(None, "us-west-2"), created.set()))
+        thread.start()
+        assert created.wait(10)
+    thread.join()
+
+
+@mock_aws
+def test_rate_limit_buckets_are_keyed_by_account():
+    pool = ClientPool()
+    pool.client(pool.session(None, "us-east-1"), "sqs").list_queues()
+    pool.client(boto3.Session(region_name="us-west-2"), "sqs").list_queues()
+
+    accounts = {(row["Account"], row["Region"]) for row in RATE_LIMITER.stats() if row["Service"] == "sqs"}
+    assert {("123456789012", "us-east-1"), ("123456789012", "us-west-2")} <= accounts
@@ -0,0 +1,177 @@
+import json
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import boto3
+import pytest
+from moto import mock_aws
+from modules import config_inventory
+from modules.config_inventory import to_api_shape
+from modules.context import CollectionContext
+from modules.ebs import list_ebs_volumes
+from modules.ec2 import list_ec2_instances
+from modules.nacl import list_nacls
+from modules.sg import list_security_groups
+from modules.subnet import list_subnets
+
+RECORDED_RESULTS = os.path.join(os.path.dirname(__file__), "fixtures", "config_select_resource_config.json")
+
+
+def test_to_api_shape_restores_keys_and_timestamps_and_drops_nulls():
+    shape = to_api_shape({
+        "instanceId": "i-1",
+        "launchTime": "2024-05-02T03:04:05.000Z",
+        "iamInstanceProfile": None,
+        "placement": {"availabilityZone": "us-east-1a", "hostId": None},
+        "tags": [{"key": "Name", "value": "web-1"}],
+        "productCodes": [],
+    })
+
+    assert shape == {
+        "InstanceId": "i-1",
+        "LaunchTime": datetime(2024, 5, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "Placement": {"AvailabilityZone": "us-east-1a"},
+        "Tags": [{"Key": "Name", "Value": "web-1"}],
+        "ProductCodes": [],
+    }
+
+
+def test_fast_path_is_on_by_default():
+    assert config_inventory.CONFIG_FAST_PATH is True
+
+
+def fake_config_client(statuses, recorders):
+    return SimpleNamespace(
+        describe_configuration_recorder_status=lambda: {"ConfigurationRecordersStatus": statuses},
+        describe_configuration_recorders=lambda: {"ConfigurationRecorders": recorders},
+    )
+
+
+def test_only_continuously_recorded_datasets_come_from_config():
+    recording = [{"recording": True, "lastStatus": "Success"}]
+    all_supported = {"recordingGroup": {"allSupported": True}}
+    assert config_inventory.recorded_datasets(fake_config_client(recording, [all_supported])) == set(
+        config_inventory.CONFIG_RESOURCE_TYPES)
+
+    # A failing or stopped recorder leaves Config behind the live API: everything falls back
+    failing = [{"recording": True, "lastStatus": "Failure"}]
+    assert config_inventory.recorded_datasets(fake_config_client(failing, [all_supported])) == set()
+    stopped = [{"recording": False, "lastStatus": "Success"}]
+    assert config_inventory.recorded_datasets(fake_config_client(stopped, [all_supported])) == set()
+
+    # Daily recording (here for everything but instances) can be a day old
+    daily = {**all_supported, "recordingMode": {
+        "recordingFrequency": "DAILY",
+        "recordingModeOverrides": [{"resourceTypes": ["AWS::EC2::Instance"], "recordingFrequency": "CONTINUOUS"}],
+    }}
+    assert config_inventory.recorded_datasets(fake_config_client(recording, [daily])) == {"instances"}
+
+    excluded = {"recordingGroup": {"allSupported": False, "recordingStrategy": {"useOnly": "EXCLUSION_BY_RESOURCE_TYPES"},
+                                   "exclusionByResourceTypes": {"resourceTypes": ["AWS::EC2::Volume"]}}}
+    assert "volumes" not in config_inventory.recorded_datasets(fake_config_client(recording, [excluded]))
+
+
+def test_aggregator_is_queried_once_and_split_by_account_and_region(monkeypatch):
+    with open(RECORDED_RESULTS) as f:
+        items = json.load(f)
+    results = [json.dumps({**item, "accountId": account, "awsRegion": region})
+               for account, region in [("111111111111", "us-east-1"), ("222222222222", "ap-northeast-2"),
+                                       ("333333333333", "us-east-1")]
+               for item in items]
+    sources = [
+        {"SourceId": "111111111111", "AwsRegion": "us-east-1", "LastUpdateStatus": "SUCCEEDED"},
+        {"SourceId": "222222222222", "AwsRegion": "ap-northeast-2", "LastUpdateStatus": "SUCCEEDED"},
+        {"SourceId": "333333333333", "AwsRegion": "us-east-1", "LastUpdateStatus": "FAILED"},
+    ]
+    calls = []
+
+    def fake_fetch_all(client, operation, result_key, **kwargs):
+        calls.append((client, operation, kwargs.get("ConfigurationAggregatorName")))
+        return sources if operation == "describe_configuration_aggregator_sources_status" else results
+
+    sessions = []
+    monkeypatch.setattr(config_inventory, "CONFIG_AGGREGATOR", "org")
+    monkeypatch.setattr(config_inventory, "CONFIG_AGGREGATOR_PROFILE", "audit")
+    monkeypatch.setattr(config_inventory, "get_session", lambda profile, region: sessions.append(profile) or profile)
+    monkeypatch.setattr(config_inventory, "get_client", lambda session, service: f"{session}:{service}")
+    monkeypatch.setattr(config_inventory, "fetch_all", fake_fetch_all)
+    monkeypatch.setattr(config_inventory, "AGGREGATOR_INVENTORY", config_inventory.AggregatorInventory())
+
+    def context(account_id, region_name):
+        return SimpleNamespace(account_id=account_id, region_name=region_name, profile_name=account_id)
+
+    first = config_inventory.select_config_resources(context("111111111111", "us-east-1"))
+    second = config_inventory.select_config_resources(context("222222222222", "ap-northeast-2"))
+    outdated = config_inventory.select_config_resources(context("333333333333", "us-east-1"))
+    unknown = config_inventory.select_config_resources(context("111111111111", "eu-west-1"))
+
+    # One query from the aggregator account serves every context of the run
+    assert sessions == ["audit"]
+    assert [operation for _, operation, _ in calls] == ["describe_configuration_aggregator_sources_status",
+                                                        "select_aggregate_resource_config"]
+    assert all(client == "audit:config" and name == "org" for client, _, name in calls)
+    assert set(first) == set(second) == set(config_inventory.CONFIG_RESOURCE_TYPES)
+    assert first["instances"][0]["InstanceId"] == "i-0a1b2c3d4e5f60001"
+    assert "IamInstanceProfile" not in first["instances"][0]
+    assert outdated == {} and unknown == {}
+
+
+@pytest.fixture
+def config_context(monkeypatch):
+    # Context whose EC2 reference datasets come from a recorded select_resource_config response
+    with open(RECORDED_RESULTS) as f:
+        results = [json.dumps(item) for item in json.load(f)]
+    monkeypatch.setattr(config_inventory, "CONFIG_FAST_PATH", True)
+    monkeypatch.setattr(config_inventory, "recorded_datasets", lambda client: set(config_inventory.CONFIG_RESOURCE_TYPES))
+    monkeypatch.setattr(config_inventory, "fetch_all", lambda client, operation, result_key, **kwargs: results)
+    with mock_aws():
+        context = CollectionContext(boto3.Session(region_name="us-east-1"))
+        assert set(context.config_resources) == set(config_inventory.CONFIG_RESOURCE_TYPES)
+        yield context
+
+
+def test_ec2_collector_on_config_items(config_context):
+    rows = list_ec2_instances(config_context.session, config_context)
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row["Instance ID"], row["Instance Name"], row["Subnet Name"]) == ("i-0a1b2c3d4e5f60001", "web-1", "app-a")
+    assert (row["Key Name"], row["IAM Role"], row["Public IP Address"]) == ("-", "-", "-")
+    assert (row["Volumes"], row["Volume Sizes"]) == ("vol-0000000000000a001", "8 GB")
+    assert row["Launch Time"] == "2024-05-02 03:04:05"
+
+
+def test_subnet_collector_on_config_items(config_context):
+    rows = list_subnets(config_context.session, config_context)
+
+    assert [(row["ID"], row["Route Table Name"], row["Network ACL ID"], row["IGW/NAT/TG"]) for row in rows] == [
+        ("subnet-0000000000000a001", "private-a", "acl-0000000000000a001", "NAT")
+    ]
+
+
+def test_nacl_collector_on_config_items(config_context):
+    rows = list_nacls(config_context.session, config_context)
+
+    assert [(row["Direction"], row["Rule"], row["Protocol"], row["Port Range"]) for row in rows] == [
+        ("Inbound", 100, "TCP", "443-443"),
+        ("Outbound", 100, "All", "-"),
+        ("Inbound", "*", "All", "-"),
+    ]
+
+
+def test_ebs_collector_on_config_items(config_context):
+    rows = list_ebs_volumes(config_context.session, config_context)
+
+    assert [(row["Volume ID"], row["Throughput"], row["Attachment"]) for row in rows] == [
+        ("vol-0000000000000a001", "N/A", "i-0a1b2c3d4e5f60001 (attached)")
+    ]
+
+
+def test_security_group_collector_on_config_items(config_context):
+    rows = list_security_groups(config_context.session, config_context)
+
+    assert [(row["Direction"], row["Protocol"], row["Port Range"], row["Source"], row["Destination"], row["Usage"])
+            for row in rows] == [
+        ("Inbound", "tcp", "443", "0.0.0.0/0", "-", True),
+        ("Outbound", "all", "-", "-", "0.0.0.0/0", True),
+    ]
@@ -0,0 +1,55 @@
+import boto3
+from moto import mock_aws
+from modules.context import CollectionContext
+from modules.tg import list_target_groups
+
+
+@mock_aws
+def test_target_group_describes_instances_missing_from_index():
+    session = boto3.Session(region_name="us-east-1")
+    ec2 = session.client("ec2")
+    elbv2 = session.client("elbv2")
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    subnet_id = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24")["Subnet"]["SubnetId"]
+
+    context = CollectionContext(session)
+    assert context.instances == []
+
+    # Launched after the context loaded its instance index
+    instance_id = ec2.run_instances(
+        ImageId="ami-12345678", MinCount=1, MaxCount=1, SubnetId=subnet_id,
+        TagSpecifications=[{"ResourceType": "instance", "Tags": [{"Key": "Name", "Value": "web-1"}]}]
+    )["Instances"][0]["InstanceId"]
+    tg_arn = elbv2.create_target_group(
+        Name="web", Protocol="HTTP", Port=80, VpcId=vpc_id, TargetType="instance"
+    )["TargetGroups"][0]["TargetGroupArn"]
+    elbv2.register_targets(TargetGroupArn=tg_arn, Targets=[{"Id": instance_id}])
+
+    rows = list_target_groups(session, context)
+
+    assert [(row["Instance ID"], row["Instance Name"]) for row in rows] == [(instance_id, "web-1")]
+    assert rows[0]["Zone"].startswith("us-east-1")
+
+
+@mock_aws
+def test_s3_tag_sweep_is_filtered_to_buckets():
+    session = boto3.Session(region_name="us-east-1")
+    s3 = session.client("s3")
+    s3.create_bucket(Bucket="tagged")
+    s3.put_bucket_tagging(Bucket="tagged", Tagging={"TagSet": [{"Key": "team", "Value": "data"}]})
+    session.client("ec2").create_vpc(
+        CidrBlock="10.0.0.0/16",
+        TagSpecifications=[{"ResourceType": "vpc", "Tags": [{"Key": "Name", "Value": "main"}]}]
+    )
+
+    context = CollectionContext(session)
+    bucket_tags = context.resource_tags_in("us-east-1", "s3")
+
+    assert list(bucket_tags) == ["arn:aws:s3:::tagged"]
+    assert context.tags_of("arn:aws:s3:::tagged", "us-east-1", "s3") == [{"Key": "team", "Value": "data"}]
+    # Untagged or unknown ARNs are not in the index; callers fall back to the per-resource call
+    assert context.tags_of("arn:aws:s3:::missing", "us-east-1", "s3") is None
+
+    # Once the region's full index is loaded, type-filtered lookups reuse it
+    assert len(context.resource_tags) == 2
+    assert context.resource_tags_in("us-east-1", "s3") is context.resource_tags
@@ -0,0 +1,50 @@
+from botocore.exceptions import ClientError
+from modules import fanout
+from modules.fanout import fan_out
+
+
+def throttled():
+    return ClientError({"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, "DescribeThing")
+
+
+def test_results_keep_item_order_and_report_failures():
+    def call(item):
+        if item == 3:
+            raise ValueError("gone")
+        return item * 10
+
+    results = fan_out("elbv2", call, range(6))
+
+    assert [(item, result) for item, result, _ in results] == [(0, 0), (1, 10), (2, 20), (3, None), (4, 40), (5, 50)]
+    assert [item for item, _, error in results if error is not None] == [3]
+
+
+def test_throttled_items_are_retried(monkeypatch):
+    monkeypatch.setattr("modules.common.time.sleep", lambda seconds: None)
+    attempts = {}
+
+    def call(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if attempts[item] < 3:
+            raise throttled()
+        return item
+
+    results = fan_out("s3", call, ["a", "b"])
+
+    assert [(item, result, error) for item, result, error in results] == [("a", "a", None), ("b", "b", None)]
+    assert attempts == {"a": 3, "b": 3}
+
+
+def test_pool_size_follows_service_limit(monkeypatch):
+    sizes = []
+
+    class RecordingExecutor(fanout.ThreadPoolExecutor):
+        def __init__(self, max_workers):
+            sizes.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(fanout, "ThreadPoolExecutor", RecordingExecutor)
+    fan_out("opensearch", lambda item: item, range(10))
+    fan_out("unknown-service", lambda item: item, range(2))
+
+    assert sizes == [fanout.FANOUT_LIMITS["opensearch"], 2]
@@ -0,0 +1,51 @@
+import threading
+import pytest
+import app
+from modules.jobs import JobManager, JobQueueFull
+
+
+def blocking_build(release):
+    def build(job):
+        release.wait(5)
+        return "/nonexistent.zip", "inventory.zip"
+    return build
+
+
+def test_identical_key_returns_active_job():
+    manager = JobManager(max_workers=1, max_pending=4)
+    release = threading.Event()
+    job, created = manager.submit(("selected", "p", "r", False), 26, blocking_build(release))
+    again, created_again = manager.submit(("selected", "p", "r", False), 26, blocking_build(release))
+    assert created and not created_again
+    assert again is job
+
+    release.set()
+    manager._executor.shutdown(wait=True)
+    assert job.status == "succeeded"
+    assert job.to_dict()["artifact"] == f"/jobs/{job.id}/artifact"
+
+
+def test_queue_full_rejects_new_keys():
+    manager = JobManager(max_workers=1, max_pending=2)
+    release = threading.Event()
+    manager.submit(("selected", "p", "a", False), 1, blocking_build(release))
+    manager.submit(("selected", "p", "b", False), 1, blocking_build(release))
+    with pytest.raises(JobQueueFull):
+        manager.submit(("selected", "p", "c", False), 1, blocking_build(release))
+    release.set()
+    manager._executor.shutdown(wait=True)
+
+
+def test_refresh_download_is_not_deduplicated_with_cached_one():
+    args = {"profile": "p", "region": "us-east-1"}
+    cached_key, _, _ = app.resolve_download("selected", args)
+    refresh_key, _, _ = app.resolve_download("selected", {**args, "refresh": "1"})
+    assert cached_key != refresh_key
+
+    manager = JobManager(max_workers=1, max_pending=4)
+    release = threading.Event()
+    cached_job, _ = manager.submit(cached_key, 1, blocking_build(release))
+    refresh_job, created = manager.submit(refresh_key, 1, blocking_build(release))
+    assert created and refresh_job is not cached_job
+    release.set()
+    manager._executor.shutdown(wait=True)
@@ -0,0 +1,60 @@
+import threading
+from types import SimpleNamespace
+from modules.paginate import PAGE_STATS, paginate, fetch_all
+
+
+class FakeClient:
+    def __init__(self, pages, page_requested=None):
+        self._pages = pages
+        self._page_requested = page_requested or {}
+        self.meta = SimpleNamespace(service_model=SimpleNamespace(service_id=SimpleNamespace(hyphenize=lambda: "fake")))
+
+    def can_paginate(self, operation):
+        return operation != "get_single"
+
+    def get_paginator(self, operation):
+        def pages(**kwargs):
+            for index, page in enumerate(self._pages):
+                if index in self._page_requested:
+                    self._page_requested[index].set()
+                yield page
+        return SimpleNamespace(paginate=pages)
+
+    def get_single(self, **kwargs):
+        return self._pages[0]
+
+
+def stats_for(operation):
+    return next(entry for entry in PAGE_STATS.stats() if entry["Service"] == "fake" and entry["Operation"] == operation)
+
+
+def test_next_page_is_requested_while_the_current_one_is_consumed():
+    for prefetch in (True, False):
+        second_page = threading.Event()
+        client = FakeClient([{"Items": [1, 2]}, {"Items": [3]}], {1: second_page})
+        seen = []
+        for item in paginate(client, "list_items", "Items", prefetch=prefetch):
+            if item == 1:
+                seen.append(second_page.wait(1 if prefetch else 0.1))
+        assert seen == [prefetch]
+
+
+def test_items_and_pages_are_recorded():
+    client = FakeClient([{"Items": [1, 2]}, {"Items": []}, {"Items": [3]}])
+    assert fetch_all(client, "list_recorded", "Items") == [1, 2, 3]
+    assert list(paginate(client, "list_recorded")) == client._pages
+
+    entry = stats_for("list_recorded")
+    assert (entry["Calls"], entry["Pages"], entry["Items"], entry["Max Pages"]) == (2, 6, 6, 3)
+
+
+def test_single_page_operations_and_early_exit_are_recorded():
+    client = FakeClient([{"Items": [1, 2, 3]}, {"Items": [4]}])
+    assert fetch_all(client, "get_single", "Items") == [1, 2, 3]
+    assert stats_for("get_single")["Last Pages"] == 1
+
+    # Stopping after the first item still closes the listing and records what was read
+    items = paginate(client, "list_partial", "Items")
+    assert next(items) == 1
+    items.close()
+    assert stats_for("list_partial")["Last Pages"] == 1
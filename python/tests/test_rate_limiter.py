@@ -0,0 +1,83 @@
+import boto3
+import pytest
+from types import SimpleNamespace
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from modules.client_pool import CLIENT_CONFIG
+from modules import rate_limiter
+from modules.rate_limiter import TokenBucket, RateLimiter, api_family, MIN_RATE
+
+
+def test_throttle_halves_rate_once_per_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(8.0, 20.0)
+
+    bucket.on_throttle()
+    assert bucket.rate == 4.0
+    # A burst of throttles from the same wave counts as one decrease
+    bucket.on_throttle()
+    assert bucket.rate == 4.0
+    now[0] += rate_limiter.DECREASE_COOLDOWN
+    bucket.on_throttle()
+    assert bucket.rate == 2.0
+    assert bucket.throttles == 3
+    assert bucket.tokens <= 0
+
+
+def test_rate_never_drops_below_floor(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(1.0, 5.0)
+    for _ in range(10):
+        now[0] += rate_limiter.DECREASE_COOLDOWN
+        bucket.on_throttle()
+    assert bucket.rate == MIN_RATE
+
+
+def test_success_recovers_additively_up_to_ceiling():
+    bucket = TokenBucket(2.0, 3.0)
+    bucket.on_success()
+    assert 2.0 < bucket.rate < 3.0
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 3.0
+
+
+def test_acquire_waits_when_bucket_is_empty(monkeypatch):
+    now = [0.0]
+    slept = []
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limiter.time, "sleep", slept.append)
+    bucket = TokenBucket(2.0, 2.0)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.5
+    assert slept == [0.5]
+
+
+THROTTLED_BODY = (b"<ErrorResponse><Error><Type>Sender</Type><Code>Throttling</Code>"
+                  b"<Message>Rate exceeded</Message></Error><RequestId>1</RequestId></ErrorResponse>")
+
+
+def test_throttled_call_retries_up_to_the_client_retry_limit(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda seconds: None)
+    limiter = RateLimiter()
+    client = boto3.client("sts", region_name="us-east-1", config=CLIENT_CONFIG)
+    limiter.register(client, lambda: "123456789012")
+    attempts = []
+
+    def throttled_response(request, **kwargs):
+        # Every HTTP attempt gets a 400 Throttling response instead of reaching AWS
+        attempts.append(request.url)
+        return AWSResponse(request.url, 400, {}, SimpleNamespace(stream=lambda: [THROTTLED_BODY]))
+
+    client.meta.events.register("before-send.sts", throttled_response)
+    with pytest.raises(ClientError) as error:
+        client.get_caller_identity()
+
+    # The initial attempt plus CLIENT_CONFIG's 5 retries: the limit botocore's own retry handler applies
+    assert len(attempts) == client.meta.config.retries["total_max_attempts"] == 6
+    assert error.value.response["ResponseMetadata"]["RetryAttempts"] == 5
+    bucket = limiter.bucket("123456789012", "us-east-1", "sts", api_family("GetCallerIdentity"))
+    assert bucket.throttles == len(attempts)
+    assert limiter.stats()[0]["Account"] == "123456789012"
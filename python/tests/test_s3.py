@@ -0,0 +1,59 @@
+import boto3
+from botocore.exceptions import EndpointConnectionError
+from moto import mock_aws
+from modules import s3
+
+
+def test_bucket_region_maps_legacy_locations():
+    assert s3.bucket_region(None) == "us-east-1"
+    assert s3.bucket_region("EU") == "eu-west-1"
+    assert s3.bucket_region("ap-northeast-2") == "ap-northeast-2"
+
+
+@mock_aws
+def test_connection_error_on_one_bucket_keeps_the_others(monkeypatch):
+    session = boto3.Session(region_name="us-east-1")
+    client = session.client("s3")
+    for name in ("alpha", "beta"):
+        client.create_bucket(Bucket=name)
+
+    describe_bucket = s3.describe_bucket
+
+    def flaky(context, s3_client, bucket, summary_only=False):
+        if bucket["Name"] == "alpha":
+            raise EndpointConnectionError(endpoint_url="https://alpha.s3.amazonaws.com")
+        return describe_bucket(context, s3_client, bucket, summary_only)
+
+    monkeypatch.setattr(s3, "describe_bucket", flaky)
+    rows = s3.list_s3_buckets(session)
+
+    assert [(row["Bucket Name"], row["Region"]) for row in rows] == [("alpha", "Unknown"), ("beta", "us-east-1")]
+    assert rows[0].keys() == rows[1].keys()
+
+
+@mock_aws
+def test_summary_mode_skips_the_optional_calls(monkeypatch):
+    session = boto3.Session(region_name="us-east-1")
+    session.client("s3").create_bucket(Bucket="alpha")
+    operations = []
+    session.events.register("before-call.s3", lambda model, **kwargs: operations.append(model.name))
+
+    rows = s3.list_s3_buckets(session, summary_only=True)
+
+    assert rows == [{"Bucket Name": "alpha", "Creation Date": rows[0]["Creation Date"], "Region": "us-east-1"}]
+    assert sorted(set(operations)) == ["GetBucketLocation", "ListBuckets"]
+
+
+@mock_aws
+def test_api_serves_the_summary_columns(monkeypatch):
+    import app
+    session = boto3.Session(region_name="us-east-1")
+    session.client("s3").create_bucket(Bucket="alpha")
+    monkeypatch.setattr(app, "get_session", lambda profile, region: session)
+
+    client = app.app.test_client()
+    summary = client.get("/api/s3?profile=summary-test&summary=1").get_json()
+    full = client.get("/api/s3?profile=summary-test").get_json()
+
+    assert summary["columns"] == ["Bucket Name", "Creation Date", "Region"]
+    assert "Versioning" in full["columns"]
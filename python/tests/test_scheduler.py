@@ -0,0 +1,55 @@
+import threading
+import time
+from modules.scheduler import DependencyScheduler
+
+
+def test_cancel_drops_tasks_that_have_not_started():
+    cancel = threading.Event()
+    ran = []
+
+    def first():
+        ran.append("first")
+        cancel.set()
+        return "first"
+
+    scheduler = DependencyScheduler(max_workers=1, cancel=cancel)
+    scheduler.add("first", first, "ec2")
+    scheduler.add("second", lambda: ran.append("second"), "ec2", deps=["first"])
+    scheduler.add("third", lambda: ran.append("third"), "s3", deps=["first"])
+    results = scheduler.run()
+
+    assert ran == ["first"]
+    assert results == {"first": "first"}
+    assert scheduler.cancelled == {"second", "third"}
+
+
+def test_dependencies_run_first_and_service_caps_hold():
+    lock = threading.Lock()
+    running = {}
+    peak = {}
+    order = []
+
+    def task(name, service):
+        def run():
+            with lock:
+                running[service] = running.get(service, 0) + 1
+                peak[service] = max(peak.get(service, 0), running[service])
+                order.append(name)
+            time.sleep(0.03)
+            with lock:
+                running[service] -= 1
+            return name
+        return run
+
+    scheduler = DependencyScheduler(max_workers=8, service_limits={"ec2": 2}, default_service_limit=1)
+    scheduler.add("context.instances", task("context.instances", "ec2"), "ec2")
+    for i in range(4):
+        scheduler.add(f"ec2-{i}", task(f"ec2-{i}", "ec2"), "ec2", deps=["context.instances"])
+    for i in range(3):
+        scheduler.add(f"s3-{i}", task(f"s3-{i}", "s3"), "s3")
+    results = scheduler.run()
+
+    assert len(results) == 8
+    assert peak == {"ec2": 2, "s3": 1}
+    assert all(order.index("context.instances") < order.index(f"ec2-{i}") for i in range(4))
+    assert all(scheduler.timings["context.instances"][1] <= scheduler.timings[f"ec2-{i}"][0] for i in range(4))
@@ -0,0 +1,54 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from modules.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def collect():
+        calls.append(1)
+        release.wait(5)
+        return ["vpc-1"]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, ("a", "us-east-1", "vpcs"), collect)
+        while not flight.in_flight():
+            pass
+        followers = [executor.submit(flight.do, ("a", "us-east-1", "vpcs"), collect) for _ in range(3)]
+        # Give the followers time to join the in-flight call before it completes
+        time.sleep(0.1)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert results[0] == (["vpc-1"], False)
+    assert all(result == (["vpc-1"], True) for result in results[1:])
+    assert flight.in_flight() == []
+
+
+def test_error_is_shared_and_key_is_forgotten():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("Throttling")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", failing)
+        while not flight.in_flight():
+            pass
+        follower = executor.submit(flight.do, "key", failing)
+        time.sleep(0.1)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    # The next call runs again instead of replaying the failure
+    assert flight.do("key", lambda: "ok") == ("ok", False)
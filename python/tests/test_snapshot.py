@@ -0,0 +1,57 @@
+import threading
+from modules import snapshot as snapshot_module
+from modules.snapshot import SnapshotStore
+
+
+def make_store(tmp_path, **kwargs):
+    return SnapshotStore(str(tmp_path / "snapshots.sqlite3"), **kwargs)
+
+
+def test_snapshot_is_fresh_until_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(snapshot_module.time, "time", lambda: now[0])
+    store = make_store(tmp_path, ttl=60)
+
+    store.save("p", "us-east-1", "vpcs", [{"VPC ID": "vpc-1"}])
+    assert store.has_fresh("p", "us-east-1", "vpcs")
+    assert store.fresh("p", "us-east-1", "vpcs").data == [{"VPC ID": "vpc-1"}]
+
+    now[0] += 60
+    assert not store.has_fresh("p", "us-east-1", "vpcs")
+    assert store.fresh("p", "us-east-1", "vpcs") is None
+    stale = store.latest("p", "us-east-1", "vpcs")
+    assert stale.data == [{"VPC ID": "vpc-1"}] and not stale.is_fresh
+    assert store.latest("p", "us-west-2", "vpcs") is None
+
+
+def test_only_newest_snapshots_are_kept(tmp_path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(snapshot_module.time, "time", lambda: now[0])
+    store = make_store(tmp_path, ttl=60, keep=2)
+    for i in range(4):
+        now[0] += 1
+        store.save("p", "r", "ec2", [i])
+    with store._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 2
+    assert store.latest("p", "r", "ec2").data == [3]
+
+
+def test_refresh_async_runs_once_per_key(tmp_path):
+    store = make_store(tmp_path, ttl=60)
+    release = threading.Event()
+    calls = []
+
+    def collect(profile, region, resource):
+        calls.append((profile, region, resource))
+        release.wait(5)
+        store.save(profile, region, resource, ["new"])
+
+    assert store.refresh_async("p", "r", "s3", collect)
+    assert store.is_refreshing("p", "r", "s3")
+    assert not store.refresh_async("p", "r", "s3", collect)
+    release.set()
+    store._refresh_executor.shutdown(wait=True)
+
+    assert calls == [("p", "r", "s3")]
+    assert not store.is_refreshing("p", "r", "s3")
+    assert store.fresh("p", "r", "s3").data == ["new"]